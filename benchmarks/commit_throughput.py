@@ -0,0 +1,69 @@
+"""
+Compare commit throughput of SQLite's default profile with ``SQLITE_PRAGMAS``.
+
+Run from the repository root::
+
+    python -m benchmarks.commit_throughput --commits 2000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from modules import repository
+from modules.db import SQLITE_PRAGMAS, BotDb
+
+PROFILES = {"default": {}, "tuned": SQLITE_PRAGMAS}
+
+
+async def measure(path: str, pragmas: dict[str, str], commits: int, concurrency: int):
+    """
+    Time ``commits`` single-row writes, ``concurrency`` at a time.
+
+    Writes go through ``BotDb.write``, so concurrent ones share commits.
+
+    Returns:
+        float: Commits per second.
+    """
+    db = BotDb(f"sqlite:///{path}", workers=concurrency, pragmas=pragmas)
+    await db.migrate()
+    await db.write(repository.add_research, 0, "benchmark")
+
+    async def worker(offset: int):
+        for number in range(offset, commits, concurrency):
+            await db.write(
+                repository.add_demand,
+                0,
+                "benchmark",
+                f"demand {number}",
+                added_by="benchmark",
+                researcher=None,
+                deadline=None,
+            )
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    db.close()
+    return commits / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commits", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--dir", help="Where to create the database files")
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        for name, pragmas in PROFILES.items():
+            with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+                path = os.path.join(directory, "bench.db")
+                rate = await measure(path, pragmas, args.commits, concurrency)
+            print(f"{name:>8} concurrency={concurrency}: {rate:10.1f} commits/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
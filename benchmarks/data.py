@@ -0,0 +1,93 @@
+import datetime
+import random
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from modules.db import Dbstruct
+from modules.migrations import rebuild_research_counters
+
+# Rows per executemany, to bound memory while seeding the larger sizes.
+CHUNK = 5000
+
+WORDS = (
+    "analysis survey model data network learning theory method system design "
+    "review history language study impact policy health energy climate urban "
+    "تحليل دراسة نموذج بيانات شبكة تعلم نظرية منهج نظام تصميم مراجعة تاريخ"
+).split()
+
+
+def _title(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def research_name(number: int) -> str:
+    return f"research {number}"
+
+
+def seed(session: Session, rows: int, seed: int = 0) -> dict:
+    """
+    Fill empty tables with ``rows`` demands and ``rows`` resources.
+
+    The same ``rows`` and ``seed`` always produce the same data. Demands are
+    spread over ``rows // 100`` research (at least one), and each resource
+    belongs to a random demand of its research.
+
+    Args:
+        rows (int): Demands, and resources, to create.
+        seed (int): Seed for the random generator.
+
+    Returns:
+        dict: ``research``, ``demands`` and ``resources`` row counts.
+    """
+    rng = random.Random(seed)
+    research_count = max(1, rows // 100)
+    session.execute(
+        insert(Dbstruct.research),
+        [{"name": research_name(number)} for number in range(research_count)],
+    )
+
+    start = datetime.datetime(2025, 1, 1)
+    for offset in range(0, rows, CHUNK):
+        session.execute(
+            insert(Dbstruct.demands),
+            [
+                {
+                    "research_id": number % research_count + 1,
+                    "demand": f"{_title(rng, 3)} {number}",
+                    "added_by": f"user{rng.randrange(50)}",
+                    "researcher": (
+                        f"user{rng.randrange(50)}" if rng.random() < 0.7 else None
+                    ),
+                    "deadline": (
+                        start + datetime.timedelta(hours=rng.randrange(24 * 365))
+                        if rng.random() < 0.8
+                        else None
+                    ),
+                    "done": rng.random() < 0.3,
+                }
+                for number in range(offset, min(offset + CHUNK, rows))
+            ],
+        )
+
+    for offset in range(0, rows, CHUNK):
+        values = []
+        for number in range(offset, min(offset + CHUNK, rows)):
+            research_id = rng.randrange(research_count) + 1
+            # Demand numbers congruent to research_id - 1 belong to it.
+            demand_number = rng.randrange(research_id - 1, rows, research_count)
+            values.append(
+                {
+                    "resource_name": f"{_title(rng, 5)} {number}",
+                    "resource_link": f"https://example{rng.randrange(200)}.org/{number}",
+                    "research_id": research_id,
+                    "demand_id": demand_number + 1,
+                    "added_by": f"user{rng.randrange(50)}",
+                    "is_read": rng.random() < 0.5,
+                }
+            )
+        session.execute(insert(Dbstruct.resources), values)
+
+    # The rows above bypass the repository, which keeps the counters current.
+    rebuild_research_counters(session.connection())
+    return {"research": research_count, "demands": rows, "resources": rows}
@@ -0,0 +1,97 @@
+import datetime
+import types
+
+from modules.autocomplete import AutocompleteIndex
+from modules.db import BotDb
+from modules.reminders import ReminderScheduler
+from modules.render_cache import RenderCache
+
+
+class FakeUser:
+    def __init__(self, name: str = "benchmark", user_id: int = 1) -> None:
+        self.id = user_id
+        self.name = name
+        self.mention = f"@{name}"
+        self.display_avatar = types.SimpleNamespace(url="https://example.com/a.png")
+
+
+class FakeResponse:
+    """
+    Stands in for ``interaction.response`` and keeps what was sent.
+    """
+
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, **kwargs) -> None:
+        self._done = True
+
+    async def send_message(self, *args, **kwargs) -> None:
+        self._done = True
+        self._interaction.sent.append((args, kwargs))
+
+    async def edit_message(self, *args, **kwargs) -> None:
+        self._interaction.sent.append((args, kwargs))
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction") -> None:
+        self._interaction = interaction
+
+    async def send(self, *args, **kwargs) -> None:
+        self._interaction.sent.append((args, kwargs))
+
+
+class FakeNamespace(types.SimpleNamespace):
+    # Options the user has not filled in read as None, like discord.py's.
+    def __getattr__(self, name):
+        return None
+
+
+class FakeInteraction:
+    """
+    The parts of ``discord.Interaction`` the cogs use, without a gateway.
+
+    Args:
+        client (BenchBot): The bot the command runs on.
+        **options: Options already filled in, as seen by autocomplete.
+
+    Attributes:
+        sent (list): ``(args, kwargs)`` of every message sent or edited.
+    """
+
+    def __init__(self, client: "BenchBot", **options) -> None:
+        self.client = client
+        self.user = FakeUser()
+        self.guild_id = None
+        self.namespace = FakeNamespace(**options)
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.created_at = datetime.datetime.now(datetime.timezone.utc)
+        self.sent = []
+
+
+class BenchBot:
+    """
+    The services ``ResearchBot.setup_hook`` creates, without logging in.
+
+    Args:
+        db (BotDb): The database to run against.
+    """
+
+    def __init__(self, db: BotDb) -> None:
+        self.db = db
+        self.user = FakeUser("bot", 0)
+        self.users = []
+        self.autocomplete = AutocompleteIndex()
+        self.reminders = ReminderScheduler(self, [])
+        self.render_cache = RenderCache()
+        self.cogs: dict = {}
+
+    async def load(self) -> None:
+        await self.autocomplete.load(self.db)
+        await self.reminders.load(self.db)
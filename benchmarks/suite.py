@@ -0,0 +1,227 @@
+"""
+Latency and memory benchmarks for the cog commands over synthetic data.
+
+Every benchmark calls a command callback directly with a fake interaction,
+against a freshly seeded SQLite database per size. Run from the repository
+root::
+
+    python -m benchmarks.suite --sizes 1000 10000 100000 --output results.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from modules import autocomplete
+from modules.db import BotDb
+from modules.demands import Demands
+from modules.resources import ResourceManagement
+from modules.search import Search
+
+from benchmarks.data import research_name, seed
+from benchmarks.fakes import BenchBot, FakeInteraction
+
+# A benchmark is slower than the baseline when its p50 exceeds it by this factor.
+TOLERANCE = 1.5
+
+
+def _close_files(interaction: FakeInteraction) -> None:
+    for _args, kwargs in interaction.sent:
+        if "file" in kwargs:
+            kwargs["file"].close()
+
+
+async def _research_autocomplete(bot, research):
+    await autocomplete.research_autocomplete(FakeInteraction(bot), "research 1")
+
+
+async def _demand_autocomplete(bot, research):
+    interaction = FakeInteraction(bot, research=research)
+    await autocomplete.demand_autocomplete(interaction, "ana")
+
+
+async def _resource_autocomplete(bot, research):
+    await autocomplete.resource_autocomplete(FakeInteraction(bot), "analysis")
+
+
+async def _show_demands(bot, research):
+    bot.render_cache.bump()
+    cog = bot.cogs["demands"]
+    await cog.show_demands.callback(cog, FakeInteraction(bot), research)
+
+
+async def _show_demands_cached(bot, research):
+    cog = bot.cogs["demands"]
+    await cog.show_demands.callback(cog, FakeInteraction(bot), research)
+
+
+async def _show_resources(bot, research):
+    bot.render_cache.bump()
+    cog = bot.cogs["resources"]
+    await cog.show_resources.callback(cog, FakeInteraction(bot), research)
+
+
+async def _research_status(bot, research):
+    cog = bot.cogs["demands"]
+    await cog.research_status.callback(cog, FakeInteraction(bot), research)
+
+
+async def _search(bot, research):
+    cog = bot.cogs["search"]
+    await cog.search.callback(cog, FakeInteraction(bot), "analysis data")
+
+
+async def _export_demands_csv(bot, research):
+    cog = bot.cogs["demands"]
+    interaction = FakeInteraction(bot)
+    await cog.show_demands.callback(cog, interaction, research, True, "csv")
+    _close_files(interaction)
+
+
+async def _export_resources_jsonl_gzip(bot, research):
+    cog = bot.cogs["resources"]
+    interaction = FakeInteraction(bot)
+    await cog.show_resources.callback(cog, interaction, None, None, True, "jsonl", True)
+    _close_files(interaction)
+
+
+# (name, iterations, benchmark) in the order they are run.
+BENCHMARKS = [
+    ("research_autocomplete", 500, _research_autocomplete),
+    ("demand_autocomplete", 200, _demand_autocomplete),
+    ("resource_autocomplete", 500, _resource_autocomplete),
+    ("show_demands", 100, _show_demands),
+    ("show_demands_cached", 500, _show_demands_cached),
+    ("show_resources", 100, _show_resources),
+    ("research_status", 500, _research_status),
+    ("search", 100, _search),
+    ("export_demands_csv", 10, _export_demands_csv),
+    ("export_resources_jsonl_gzip", 3, _export_resources_jsonl_gzip),
+]
+
+
+def percentiles(latencies: list[float]) -> dict[str, float]:
+    """
+    Return the p50, p95 and p99 of ``latencies`` in milliseconds.
+    """
+    if len(latencies) == 1:
+        return {"p50": latencies[0], "p95": latencies[0], "p99": latencies[0]}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+async def run_benchmark(bot, research: str, iterations: int, benchmark) -> dict:
+    """
+    Time ``benchmark`` and measure its peak traced memory.
+
+    Latencies are taken without tracemalloc, which slows allocation down; the
+    peak comes from one extra traced call.
+
+    Returns:
+        dict: Percentiles in milliseconds and ``peak_kib``.
+    """
+    await benchmark(bot, research)
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await benchmark(bot, research)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    await benchmark(bot, research)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {name: round(value, 3) for name, value in percentiles(latencies).items()}
+    result["peak_kib"] = round(peak / 1024, 1)
+    return result
+
+
+async def run_size(rows: int, directory: str, only: list[str] | None) -> dict:
+    """
+    Seed a database with ``rows`` rows and run every benchmark against it.
+    """
+    db = BotDb(f"sqlite:///{os.path.join(directory, f'bench_{rows}.db')}")
+    await db.migrate()
+    await db.write(seed, rows)
+
+    bot = BenchBot(db)
+    await bot.load()
+    bot.cogs = {
+        "demands": Demands(bot),
+        "resources": ResourceManagement(bot),
+        "search": Search(bot),
+    }
+    research = research_name(0)
+
+    results = {}
+    for name, iterations, benchmark in BENCHMARKS:
+        if only and name not in only:
+            continue
+        results[name] = await run_benchmark(bot, research, iterations, benchmark)
+        print(
+            f"{rows:>7} {name:<28} "
+            + "  ".join(f"{key}={value}" for key, value in results[name].items())
+        )
+    db.close()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Return a line for every benchmark whose p50 regressed past ``tolerance``.
+    """
+    regressions = []
+    for size, benchmarks in results["sizes"].items():
+        for name, result in benchmarks.items():
+            previous = baseline["sizes"].get(size, {}).get(name)
+            if previous and result["p50"] > previous["p50"] * tolerance:
+                regressions.append(
+                    f"{size} {name}: p50 {result['p50']} ms "
+                    f"(baseline {previous['p50']} ms)"
+                )
+    return regressions
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--only", nargs="+", help="Benchmark names to run")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare with")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.sizes:
+            results["sizes"][str(rows)] = await run_size(rows, directory, args.only)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
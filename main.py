@@ -2,23 +2,126 @@ import discord
 from discord.ext import commands
 import os
 from dotenv import load_dotenv
+from modules.db import (
+    BotDb,
+    database_url_from_env,
+    legacy_guild_id_from_env,
+    pool_options_from_env,
+    sqlite_pragmas_from_env,
+)
+from modules import repository
+from modules.autocomplete import AutocompleteIndex
+from modules.enrichment import LinkEnricher, enrichment_options_from_env
+from modules.linkhealth import LinkHealthChecker, link_check_options_from_env
+from modules.metrics import CommandMetrics, metrics_address_from_env
+from modules.querylog import query_log_from_env
+from modules.reminders import ReminderScheduler, lead_times_from_env
+from modules.render_cache import RenderCache
+from modules.startup import StartupTimer, command_hash_path_from_env, sync_if_changed
 
 load_dotenv()
-bot = commands.Bot(command_prefix="!", intents=discord.Intents.all())
 TOKEN = os.environ.get("token")
 
+EXTENSIONS = ("modules.demands", "modules.resources", "modules.search")
+
+
+class ResearchBot(commands.AutoShardedBot):
+    """
+    The research manager bot.
+
+    Every research, demand and resource belongs to the guild it was created
+    in, so the bot can run any number of shards; ``SHARD_COUNT`` overrides the
+    count Discord recommends.
+
+    Attributes:
+        db (BotDb): The database shared by every cog, created in ``setup_hook``.
+        autocomplete (AutocompleteIndex): In-memory names for autocomplete.
+        reminders (ReminderScheduler): Sends deadline reminders to researchers.
+        render_cache (RenderCache): Rendered pages of the listing commands.
+        metrics (CommandMetrics): Per-command latency and database metrics,
+            served on ``/metrics`` when ``METRICS_PORT`` is set.
+        enricher (LinkEnricher): Fetches the metadata of new resource links.
+        link_checker (LinkHealthChecker): Periodically checks resource links.
+    """
+
+    async def setup_hook(self) -> None:
+        timer = StartupTimer()
+        with timer.phase("database"):
+            self.db = BotDb(
+                database_url_from_env(),
+                pragmas=sqlite_pragmas_from_env(),
+                pool=pool_options_from_env(),
+                query_log=query_log_from_env(),
+            )
+            await self.db.migrate()
+            legacy_guild_id = legacy_guild_id_from_env()
+            if legacy_guild_id:
+                claimed = await self.db.write(
+                    repository.claim_unscoped_rows, legacy_guild_id
+                )
+                if claimed:
+                    print(f"✅ Moved {claimed} research to guild {legacy_guild_id}.")
+        with timer.phase("autocomplete"):
+            self.autocomplete = AutocompleteIndex()
+            await self.autocomplete.load(self.db)
+        with timer.phase("reminders"):
+            self.reminders = ReminderScheduler(self, lead_times_from_env())
+            await self.reminders.load(self.db)
+            self.reminders.start()
+        self.render_cache = RenderCache()
+        self.enricher = LinkEnricher(self, **enrichment_options_from_env())
+        await self.enricher.start()
+        self.link_checker = LinkHealthChecker(self, **link_check_options_from_env())
+        self.link_checker.start()
+        with timer.phase("metrics"):
+            self.metrics = CommandMetrics()
+            self.metrics.track(self.db.engine)
+            self.metrics.track(self.db.read_engine)
+            address = metrics_address_from_env()
+            if address:
+                await self.metrics.start_server(*address)
+
+        # setup_hook runs once per process, unlike on_ready, which fires again
+        # on every gateway reconnect.
+        with timer.phase("extensions"):
+            for extension in EXTENSIONS:
+                await self.load_extension(extension)
+        with timer.phase("sync"):
+            try:
+                if await sync_if_changed(self.tree, command_hash_path_from_env()):
+                    print("✅ Commands synced.")
+                else:
+                    print("✅ Commands unchanged, sync skipped.")
+            except Exception as e:
+                print(f"❌ Failed to sync commands: {e}")
+        print(timer.report())
+
+    async def add_cog(self, cog: commands.Cog, **kwargs) -> None:
+        self.metrics.instrument(cog)
+        await super().add_cog(cog, **kwargs)
+
+    async def close(self) -> None:
+        self.reminders.stop()
+        await self.enricher.close()
+        await self.link_checker.stop()
+        await self.metrics.stop_server()
+        await super().close()
+        await self.db.stop_writes()
+        self.db.close()
+
+
+SHARD_COUNT = os.environ.get("SHARD_COUNT")
+
+bot = ResearchBot(
+    command_prefix="!",
+    intents=discord.Intents.all(),
+    shard_count=int(SHARD_COUNT) if SHARD_COUNT else None,
+)
+
 
 @bot.event
 async def on_ready():
-    print("bot is up and ready!!")
-    await bot.load_extension("modules.demands")
-    await bot.load_extension("modules.resources")
-
-    try:
-        await bot.tree.sync()
-        print(f"✅ Commands synced. Logged in as {bot.user}")
-    except Exception as e:
-        print(f"❌ Failed to sync commands: {e}")
+    print(f"bot is up and ready!! Logged in as {bot.user}")
 
 
 bot.run(token=TOKEN)
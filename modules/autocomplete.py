@@ -0,0 +1,223 @@
+import bisect
+import heapq
+import itertools
+import discord
+from discord import app_commands
+from modules import repository
+from modules.helper import guild_scope
+
+# Discord rejects autocomplete responses with more than 25 choices.
+MAX_CHOICES = 25
+
+
+def _grams(text: str, size: int) -> set[str]:
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+class NameIndex:
+    """
+    An in-memory prefix and substring index over autocomplete labels.
+
+    Labels are kept in a sorted list for prefix lookups and in bigram/trigram
+    posting sets for substring lookups, so a search never scans every name.
+    The same value may be added several times (e.g. demands sharing a name in
+    different researches); it stays indexed until every copy is discarded.
+    """
+
+    def __init__(self) -> None:
+        self._labels: dict = {}
+        self._refs: dict = {}
+        # Sort keys are (lowercase label, repr(value)) so that equal labels
+        # with different values stay distinct and comparable.
+        self._keys: dict = {}
+        self._values: dict = {}
+        self._sorted: list[tuple[str, str]] = []
+        self._postings: dict[str, set] = {}
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def add(self, value, label: str) -> None:
+        """
+        Index ``label`` and return ``value`` whenever it matches.
+        """
+        if value in self._refs:
+            self._refs[value] += 1
+            return
+        key = (label.lower(), repr(value))
+        self._refs[value] = 1
+        self._labels[value] = label
+        self._keys[value] = key
+        self._values[key] = value
+        bisect.insort(self._sorted, key)
+        for gram in _grams(key[0], 2) | _grams(key[0], 3):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def discard(self, value) -> None:
+        """
+        Drop one reference to ``value``, unindexing it when none remain.
+        """
+        if value not in self._refs:
+            return
+        self._refs[value] -= 1
+        if self._refs[value]:
+            return
+        del self._refs[value]
+        del self._labels[value]
+        key = self._keys.pop(value)
+        del self._values[key]
+        del self._sorted[bisect.bisect_left(self._sorted, key)]
+        for gram in _grams(key[0], 2) | _grams(key[0], 3):
+            posting = self._postings[gram]
+            posting.discard(key)
+            if not posting:
+                del self._postings[gram]
+
+    def search(
+        self, current: str, limit: int = MAX_CHOICES
+    ) -> list[tuple[str, object]]:
+        """
+        Return up to ``limit`` ``(label, value)`` pairs matching ``current``.
+
+        Prefix matches come first, then other substring matches, each in
+        alphabetical order.
+        """
+        query = current.lower()
+        matches = []
+        position = bisect.bisect_left(self._sorted, (query,))
+        while (
+            len(matches) < limit
+            and position < len(self._sorted)
+            and self._sorted[position][0].startswith(query)
+        ):
+            matches.append(self._sorted[position])
+            position += 1
+
+        if query and len(matches) < limit:
+            prefixed = set(matches)
+            if len(query) == 1:
+                # Too short for the posting sets, but a single character matches
+                # so often that an in-order scan stops almost immediately.
+                rest = (
+                    key
+                    for key in self._sorted
+                    if query in key[0] and key not in prefixed
+                )
+                matches.extend(itertools.islice(rest, limit - len(matches)))
+            else:
+                grams = _grams(query, min(len(query), 3))
+                postings = sorted(
+                    (self._postings.get(gram, set()) for gram in grams), key=len
+                )
+                candidates = postings[0].intersection(*postings[1:])
+                matches.extend(
+                    heapq.nsmallest(
+                        limit - len(matches),
+                        (
+                            key
+                            for key in candidates
+                            if query in key[0] and key not in prefixed
+                        ),
+                    )
+                )
+
+        return [
+            (self._labels[value], value) for value in map(self._values.get, matches)
+        ]
+
+
+class GuildNames:
+    """
+    The research, demand and resource names of one guild.
+
+    Attributes:
+        research (NameIndex): Research names.
+        research_ids (dict[str, int]): Research ids by name.
+        demands (NameIndex): Demand names across every research of the guild.
+        resources (NameIndex): Resource names, keyed by resource id.
+    """
+
+    def __init__(self) -> None:
+        self.research = NameIndex()
+        self.research_ids: dict[str, int] = {}
+        self.demands = NameIndex()
+        self.resources = NameIndex()
+
+    def add_research(self, research_id: int, name: str) -> None:
+        self.research.add(name, name)
+        self.research_ids[name] = research_id
+
+
+class AutocompleteIndex:
+    """
+    Research, demand and resource names kept in memory for autocomplete,
+    partitioned by guild so no guild ever sees another's names.
+
+    The names are loaded once at startup; the cogs keep the index current by
+    calling ``add``/``discard`` on the matching ``NameIndex`` of
+    ``guild(guild_id)`` after each write.
+    """
+
+    def __init__(self) -> None:
+        self._guilds: dict[int, GuildNames] = {}
+
+    def guild(self, guild_id: int) -> GuildNames:
+        """
+        Return the names of a guild, 0 for direct messages.
+        """
+        names = self._guilds.get(guild_id)
+        if names is None:
+            names = self._guilds[guild_id] = GuildNames()
+        return names
+
+    async def load(self, db) -> None:
+        """
+        Fill the index from the database.
+
+        Args:
+            db (BotDb): The bot database.
+        """
+        for guild_id, research_id, name in await db.run(repository.research_names):
+            self.guild(guild_id).add_research(research_id, name)
+        for guild_id, name in await db.run(repository.demand_names):
+            self.guild(guild_id).demands.add(name, name)
+        for guild_id, resource_id, name in await db.run(repository.resource_names):
+            self.guild(guild_id).resources.add(resource_id, name)
+
+
+def _choices(index: NameIndex, current: str) -> list[app_commands.Choice]:
+    return [
+        app_commands.Choice(name=label, value=value)
+        for label, value in index.search(current)
+    ]
+
+
+def _names(interaction: discord.Interaction) -> GuildNames:
+    return interaction.client.autocomplete.guild(guild_scope(interaction))
+
+
+async def research_autocomplete(
+    interaction: discord.Interaction,
+    current: str,
+):
+    return _choices(_names(interaction).research, current)
+
+
+async def demand_autocomplete(
+    interaction: discord.Interaction,
+    current: str,
+):
+    names = _names(interaction)
+    research_id = names.research_ids.get(interaction.namespace.research)
+    if research_id is None:
+        # No research picked yet, so offer demands from every research.
+        return _choices(names.demands, current)
+
+    demands = await interaction.client.db.run(
+        repository.research_demand_names, research_id, current, MAX_CHOICES
+    )
+    return [app_commands.Choice(name=name, value=name) for name in demands]
+
+
+async def resource_autocomplete(interaction, current):
+    return _choices(_names(interaction).resources, current)
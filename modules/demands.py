@@ -1,38 +1,113 @@
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
-from sqlalchemy.orm import Session
-from modules.db import Dbstruct, BotDb
-from modules.helper import create_embed
+from discord.ext import commands
+from modules.helper import (
+    create_embed,
+    guild_scope,
+    import_report_embed,
+    split_list,
+    utcnow,
+)
+from modules import importer
+from modules.importer import ImportFileError
+from modules import repository
+from modules.metrics import defer
+from modules.autocomplete import research_autocomplete, demand_autocomplete
+from modules.export import ExportFormat, export_demands, export_filename
+from modules.pagination import KeysetPaginator
+from modules.render_cache import invalidate
+from modules.repository import ResearchNotFound, ResearchExists, DemandNotFound
 import datetime
-import json
-import io
+import functools
 
-session: Session = BotDb().session
 
+def demands_embed(research: str, total: int, demands: list, page: int):
+    """
+    Build the embed listing one page of a research's demands.
 
-async def research_autocomplete(
-    interaction: discord.Interaction,
-    current: str,
-):
-    results = session.query(Dbstruct.research.name).all()
-    return [
-        app_commands.Choice(name=name[0], value=name[0])
-        for name in results
-        if (current.lower() in name[0].lower() if current.lower() != "" else True)
-    ]
+    Args:
+        research (str): The research name.
+        total (int): The number of demands in the research.
+        demands (list): The demand rows of this page.
+        page (int): The page number, starting at 1.
 
+    Returns:
+        discord.Embed: The page embed.
+    """
+    embed = discord.Embed(
+        title=f"📂 Demands for Research: {research}",
+        description=f"Showing {total} demands.",
+        color=discord.Color.purple(),
+        timestamp=datetime.datetime.utcnow(),
+    )
 
-async def demand_autocomplete(
-    interaction: discord.Interaction,
-    current: str,
-):
-    results = session.query(Dbstruct.demands.demand).all()
-    return [
-        app_commands.Choice(name=name[0], value=name[0])
-        for name in results
-        if current.lower() in name[0].lower()
-    ]
+    embed.set_thumbnail(url="https://cdn-icons-png.flaticon.com/512/1246/1246261.png")
+    embed.set_footer(text=f"Research Demands Overview • Page {page}")
+
+    for demand in demands:
+        deadline_str = (
+            demand.deadline.strftime("%Y-%m-%d %H:%M")
+            if demand.deadline
+            else "No Deadline"
+        )
+        researcher_str = (
+            demand.researcher if demand.researcher != repository.UNASSIGNED else False
+        )
+        status = "🟢" if researcher_str else "🟡 Pending (waiting for researcher)"
+
+        done = "🟢" if demand.done == True else "🔴"
+        embed.add_field(
+            name=f"🔹 {demand.demand}",
+            value=(
+                f"**Added by:** {demand.added_by}\n"
+                f"**Researcher:** {str(demand.researcher)}\n"
+                f"**Deadline:** {deadline_str}\n"
+                f"**Status:** {status}\n"
+                f"**Done?**: {done}"
+            ),
+            inline=False,
+        )
+    return embed
+
+
+# Discord caps an embed at 25 fields.
+MAX_STATUS_FIELDS = 25
+
+
+def status_embed(rows: list):
+    """
+    Build the embed reporting the progress of one or more research.
+
+    Args:
+        rows (list): ``repository.research_status`` rows.
+
+    Returns:
+        discord.Embed: The status embed.
+    """
+    embed = discord.Embed(
+        title="📊 حالة الأبحاث",
+        color=discord.Color.blue(),
+        timestamp=discord.utils.utcnow(),
+    )
+    for row in rows[:MAX_STATUS_FIELDS]:
+        embed.add_field(
+            name=f"📚 {row.name}",
+            value=(
+                f"📌 **Demands:** {row.demands}\n"
+                f"🧑‍🔬 **Assigned:** {row.assigned}\n"
+                f"✅ **Done:** {row.done}\n"
+                f"⏰ **Overdue:** {row.overdue}\n"
+                f"📖 **Resources:** {row.read_resources} read, "
+                f"{row.resources - row.read_resources} unread"
+            ),
+            inline=True,
+        )
+    hidden = len(rows) - MAX_STATUS_FIELDS
+    footer = "نظام إدارة الأبحاث"
+    if hidden > 0:
+        footer += f" • {hidden} more research not shown"
+    embed.set_footer(text=footer)
+    return embed
 
 
 class Demands(commands.Cog):
@@ -42,21 +117,35 @@ class Demands(commands.Cog):
 
     Attributes:
         bot (discord.Client): The Discord bot instance.
+        db (BotDb): The database shared by every cog of the bot.
     """
 
     def __init__(self, bot: discord.Client):
         self.bot = bot
+        self.db = bot.db
 
     @app_commands.command(name="add_research")
     @app_commands.describe(research_name="the name of the research")
     @commands.has_permissions(administrator=True)
     async def add_research(self, interaction: discord.Interaction, research_name: str):
-        await interaction.response.defer()
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
 
         # Add research to database
-        research = Dbstruct.research(name=research_name)
-        session.add(research)
-        session.commit()
+        try:
+            research_id = await self.db.write(
+                repository.add_research, guild_id, research_name
+            )
+        except ResearchExists:
+            embed = discord.Embed(
+                title="❌ البحث موجود بالفعل",
+                description=f"📚 يوجد بحث مسجل بالاسم:\n**{research_name}**",
+                color=discord.Color.red(),
+            )
+            embed.set_footer(text="نظام إدارة الأبحاث")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        self.bot.autocomplete.guild(guild_id).add_research(research_id, research_name)
 
         # Create success embed
         embed = discord.Embed(
@@ -91,9 +180,10 @@ class Demands(commands.Cog):
         researcher: discord.User = None,
         deadline: str = None,
     ):
-        await interaction.response.defer()
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
 
-        researcher_name = researcher.name if researcher else "غير محدد"
+        researcher_name = researcher.name if researcher else repository.UNASSIGNED
 
         try:
             if deadline:
@@ -113,12 +203,18 @@ class Demands(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        research_obj = (
-            session.query(Dbstruct.research)
-            .filter(Dbstruct.research.name == research)
-            .first()
-        )
-        if not research_obj:
+        # إضافة المطلب إلى قاعدة البيانات
+        try:
+            demand_id = await self.db.write(
+                repository.add_demand,
+                guild_id,
+                research,
+                demand,
+                added_by=interaction.user.name,
+                researcher=researcher_name,
+                deadline=deadline_dt,
+            )
+        except ResearchNotFound:
             embed = discord.Embed(
                 title="❌ البحث غير موجود",
                 description=("🔎 لم يتم العثور على بحث باسم:\n" f"**{research}**"),
@@ -127,17 +223,9 @@ class Demands(commands.Cog):
             embed.set_footer(text="نظام إدارة الأبحاث")
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
-
-        # إضافة المطلب إلى قاعدة البيانات
-        new_demand = Dbstruct.demands(
-            demand=demand,
-            added_by=interaction.user.name,
-            researcher=researcher_name,
-            research_id=research_obj.id,
-            deadline=deadline_dt,
-        )
-        session.add(new_demand)
-        session.commit()
+        self.bot.autocomplete.guild(guild_id).demands.add(demand, demand)
+        self.bot.reminders.schedule(demand_id, deadline_dt)
+        invalidate(self.bot, guild_id, research)
 
         # إنشاء Embed للنجاح مع تنسيق مريح بصريًا
         embed = discord.Embed(
@@ -165,6 +253,45 @@ class Demands(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
+    @app_commands.command(name="import_demands")
+    @app_commands.describe(
+        file="ملف CSV أو JSON بالأعمدة: research, demand, researcher, deadline"
+    )
+    @commands.has_permissions(administrator=False)
+    async def import_demands(
+        self, interaction: discord.Interaction, file: discord.Attachment
+    ):
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
+
+        data = await file.read()
+        try:
+            result = await self.db.write(
+                importer.import_demands,
+                guild_id,
+                data,
+                file.filename,
+                interaction.user.name,
+            )
+        except ImportFileError as error:
+            embed = discord.Embed(
+                title="❌ تعذر قراءة الملف",
+                description=f"⚠️ {error}",
+                color=discord.Color.red(),
+            )
+            embed.set_footer(text="نظام إدارة الأبحاث")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+
+        for demand_id, demand, deadline in result.inserted:
+            self.bot.autocomplete.guild(guild_id).demands.add(demand, demand)
+            self.bot.reminders.schedule(demand_id, deadline)
+        if result.inserted:
+            invalidate(self.bot, guild_id)
+
+        embed = import_report_embed(len(result.inserted), result.errors)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     @app_commands.command(name="assign_me")
     @app_commands.describe(research="اسم البحث", demand="المطلب")
     @app_commands.autocomplete(research=research_autocomplete)
@@ -173,15 +300,19 @@ class Demands(commands.Cog):
     async def assign_me(
         self, interaction: discord.Interaction, research: str, demand: str
     ):
-        await interaction.response.defer()
-
-        research_obj = (
-            session.query(Dbstruct.research)
-            .filter(Dbstruct.research.name == research)
-            .first()
-        )
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
 
-        if research_obj is None:
+        # تحديث الباحث
+        try:
+            await self.db.write(
+                repository.assign_researcher,
+                guild_id,
+                research,
+                demand,
+                interaction.user.name,
+            )
+        except ResearchNotFound:
             embed = discord.Embed(
                 title="❌ البحث غير موجود",
                 description=("🔎 لم يتم العثور على بحث باسم:\n" f"**{research}**"),
@@ -190,17 +321,7 @@ class Demands(commands.Cog):
             embed.set_footer(text="نظام إدارة الأبحاث")
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
-
-        demand_entry = (
-            session.query(Dbstruct.demands)
-            .filter(
-                Dbstruct.demands.research_id == research_obj.id,
-                Dbstruct.demands.demand == demand,
-            )
-            .first()
-        )
-
-        if demand_entry is None:
+        except DemandNotFound:
             embed = discord.Embed(
                 title="❌ المطلب غير موجود",
                 description=(
@@ -212,10 +333,7 @@ class Demands(commands.Cog):
             embed.set_footer(text="نظام إدارة الأبحاث")
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
-
-        # تحديث الباحث
-        demand_entry.researcher = interaction.user.name
-        session.commit()
+        invalidate(self.bot, guild_id, research)
 
         # إنشاء Embed للنجاح
         embed = discord.Embed(
@@ -257,7 +375,8 @@ class Demands(commands.Cog):
         demand: str,
         deadline: str,
     ):
-        await interaction.response.defer()
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
 
         # التحقق من تنسيق التاريخ
         try:
@@ -272,14 +391,12 @@ class Demands(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        # البحث عن البحث المطلوب
-        research_entry = (
-            session.query(Dbstruct.research)
-            .filter(Dbstruct.research.name == research)
-            .first()
-        )
-
-        if not research_entry:
+        # تحديث الموعد النهائي
+        try:
+            demand_id, previous = await self.db.write(
+                repository.set_deadline, guild_id, research, demand, deadline_dt
+            )
+        except ResearchNotFound:
             embed = discord.Embed(
                 title="❌ البحث غير موجود",
                 description=f"لم يتم العثور على بحث باسم:\n**{research}**",
@@ -288,18 +405,7 @@ class Demands(commands.Cog):
             embed.set_footer(text="نظام إدارة الأبحاث")
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
-
-        # البحث عن المطلب المطلوب
-        demand_entry = (
-            session.query(Dbstruct.demands)
-            .filter(
-                Dbstruct.demands.research_id == research_entry.id,
-                Dbstruct.demands.demand == demand,
-            )
-            .first()
-        )
-
-        if not demand_entry:
+        except DemandNotFound:
             embed = discord.Embed(
                 title="❌ المطلب غير موجود",
                 description=f"لم يتم العثور على المطلب:\n**{demand}** ضمن البحث **{research}**",
@@ -309,14 +415,9 @@ class Demands(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        # تحديث الموعد النهائي
-        old_deadline = (
-            demand_entry.deadline.strftime("%Y-%m-%d %H:%M")
-            if demand_entry.deadline
-            else "غير محدد"
-        )
-        demand_entry.deadline = deadline_dt
-        session.commit()
+        old_deadline = previous.strftime("%Y-%m-%d %H:%M") if previous else "غير محدد"
+        self.bot.reminders.schedule(demand_id, deadline_dt)
+        invalidate(self.bot, guild_id, research)
 
         # إنشاء Embed للنجاح
         embed = discord.Embed(
@@ -350,16 +451,15 @@ class Demands(commands.Cog):
     async def remove_researcher(
         self, interaction: discord.Interaction, research: str, demand: str
     ):
-        await interaction.response.defer()
-
-        # البحث عن البحث
-        research_entry = (
-            session.query(Dbstruct.research)
-            .filter(Dbstruct.research.name == research)
-            .first()
-        )
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
 
-        if not research_entry:
+        # إزالة الباحث
+        try:
+            old_researcher = await self.db.write(
+                repository.remove_researcher, guild_id, research, demand
+            )
+        except ResearchNotFound:
             embed = discord.Embed(
                 title="❌ البحث غير موجود",
                 description=f"لم يتم العثور على بحث باسم:\n**{research}**",
@@ -368,18 +468,7 @@ class Demands(commands.Cog):
             embed.set_footer(text="نظام إدارة الأبحاث")
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
-
-        # البحث عن المطلب
-        demand_entry = (
-            session.query(Dbstruct.demands)
-            .filter(
-                Dbstruct.demands.research_id == research_entry.id,
-                Dbstruct.demands.demand == demand,
-            )
-            .first()
-        )
-
-        if not demand_entry:
+        except DemandNotFound:
             embed = discord.Embed(
                 title="❌ المطلب غير موجود",
                 description=f"لم يتم العثور على المطلب:\n**{demand}** ضمن البحث **{research}**",
@@ -390,7 +479,7 @@ class Demands(commands.Cog):
             return
 
         # التحقق من وجود باحث معين
-        if demand_entry.researcher is None:
+        if old_researcher is None:
             embed = discord.Embed(
                 title="⚠️ لا يوجد باحث معين",
                 description=f"لا يوجد حاليًا باحث مسند لهذا المطلب:\n**{demand}**",
@@ -399,11 +488,7 @@ class Demands(commands.Cog):
             embed.set_footer(text="نظام إدارة الأبحاث")
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
-
-        # إزالة الباحث
-        old_researcher = demand_entry.researcher
-        demand_entry.researcher = None
-        session.commit()
+        invalidate(self.bot, guild_id, research)
 
         # إنشاء Embed للنجاح
         embed = discord.Embed(
@@ -426,114 +511,222 @@ class Demands(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="show_demands")
+    @app_commands.command(name="bulk_mark_demands_done")
     @app_commands.describe(
-        research="The name of the research",
-        export="Set to True to export demands as a JSON file",
+        research="اسم البحث",
+        done="الحالة الجديدة (مكتمل أو غير مكتمل)",
+        researcher="تغيير مطالب هذا الباحث فقط",
+        demands="أسماء المطالب مفصولة بفواصل (اتركه فارغًا لكل المطالب)",
     )
     @app_commands.autocomplete(research=research_autocomplete)
-    @commands.has_permissions(administrator=False)
-    async def show_demands(
+    @app_commands.default_permissions(administrator=True)
+    async def bulk_mark_demands_done(
         self,
         interaction: discord.Interaction,
         research: str,
-        export: bool = False,  # Optional parameter
+        done: bool = True,
+        researcher: discord.User = None,
+        demands: str = None,
     ):
-        await interaction.response.defer()
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
+
+        try:
+            changed = await self.db.write(
+                repository.bulk_set_demands_done,
+                guild_id,
+                research,
+                done,
+                researcher=researcher.name if researcher else None,
+                names=split_list(demands),
+            )
+        except ResearchNotFound:
+            embed = discord.Embed(
+                title="❌ البحث غير موجود",
+                description=f"لم يتم العثور على بحث باسم:\n**{research}**",
+                color=discord.Color.red(),
+            )
+            embed.set_footer(text="نظام إدارة الأبحاث")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
 
-        # Find the research
-        research_entry = (
-            session.query(Dbstruct.research)
-            .filter(Dbstruct.research.name == research)
-            .first()
+        for demand_id, deadline in changed:
+            if done:
+                self.bot.reminders.cancel(demand_id)
+            else:
+                self.bot.reminders.schedule(demand_id, deadline)
+        if changed:
+            invalidate(self.bot, guild_id, research)
+
+        embed = discord.Embed(
+            title="✅ تم تحديث المطالب!",
+            description=(
+                f"📚 **البحث:**\n➥ {research}\n\n"
+                f"📌 **عدد المطالب المعدلة:**\n➥ {len(changed)}\n\n"
+                f"{'🎉 **الحالة:**' if done else '⏳ **الحالة:**'}\n"
+                f"{'✅ مكتمل' if done else '❌ غير مكتمل'}"
+            ),
+            color=discord.Color.green() if done else discord.Color.orange(),
+            timestamp=discord.utils.utcnow(),
         )
+        embed.set_footer(
+            text=f"تم التعديل بواسطة: {interaction.user.name}",
+            icon_url=interaction.user.display_avatar.url,
+        )
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="bulk_remove_researcher")
+    @app_commands.describe(
+        research="اسم البحث",
+        researcher="إزالة هذا الباحث فقط",
+        demands="أسماء المطالب مفصولة بفواصل (اتركه فارغًا لكل المطالب)",
+    )
+    @app_commands.autocomplete(research=research_autocomplete)
+    @app_commands.default_permissions(administrator=True)
+    async def bulk_remove_researcher(
+        self,
+        interaction: discord.Interaction,
+        research: str,
+        researcher: discord.User = None,
+        demands: str = None,
+    ):
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
 
-        if not research_entry:
-            await interaction.followup.send("❌ Research not found.", ephemeral=True)
+        try:
+            changed = await self.db.write(
+                repository.bulk_remove_researcher,
+                guild_id,
+                research,
+                researcher=researcher.name if researcher else None,
+                names=split_list(demands),
+            )
+        except ResearchNotFound:
+            embed = discord.Embed(
+                title="❌ البحث غير موجود",
+                description=f"لم يتم العثور على بحث باسم:\n**{research}**",
+                color=discord.Color.red(),
+            )
+            embed.set_footer(text="نظام إدارة الأبحاث")
+            await interaction.followup.send(embed=embed, ephemeral=True)
             return
+        if changed:
+            invalidate(self.bot, guild_id, research)
 
-        # Get all demands for the research
-        demands = (
-            session.query(Dbstruct.demands)
-            .filter(Dbstruct.demands.research_id == research_entry.id)
-            .all()
+        embed = discord.Embed(
+            title="✅ تم إزالة الباحثين بنجاح!",
+            description=(
+                f"📚 **البحث:**\n➥ {research}\n\n"
+                f"📌 **عدد المطالب المعدلة:**\n➥ {changed}"
+            ),
+            color=discord.Color.orange(),
+            timestamp=discord.utils.utcnow(),
+        )
+        embed.set_footer(
+            text=f"تم التعديل بواسطة: {interaction.user.name}",
+            icon_url=interaction.user.display_avatar.url,
         )
 
-        if not demands:
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="show_demands")
+    @app_commands.describe(
+        research="The name of the research",
+        export="Set to True to export demands as a file",
+        export_format="The export file format",
+        compress="Gzip the exported file",
+    )
+    @app_commands.autocomplete(research=research_autocomplete)
+    @commands.has_permissions(administrator=False)
+    async def show_demands(
+        self,
+        interaction: discord.Interaction,
+        research: str,
+        export: bool = False,  # Optional parameter
+        export_format: ExportFormat = "json",
+        compress: bool = False,
+    ):
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
+
+        cache = self.bot.render_cache
+        research_id = self.bot.autocomplete.guild(guild_id).research_ids.get(research)
+        total = cache.get(research_id, (("demands",), "total"))
+        if total is None:
+            version = cache.version(research_id)
+            try:
+                total = await self.db.run(repository.count_demands, guild_id, research)
+            except ResearchNotFound:
+                await interaction.followup.send(
+                    "❌ Research not found.", ephemeral=True
+                )
+                return
+            cache.set(research_id, (("demands",), "total"), total, version)
+
+        if not total:
             await interaction.followup.send(
                 f"📭 No demands found for research `{research}`.", ephemeral=True
             )
             return
 
         if export:
-            # Convert demands to JSON
-            demands_list = [
-                {
-                    "demand": demand.demand,
-                    "added_by": demand.added_by,
-                    "researcher": demand.researcher,
-                    "deadline": (
-                        demand.deadline.strftime("%Y-%m-%d %H:%M")
-                        if demand.deadline
-                        else "No Deadline"
-                    ),
-                    "status": (
-                        "In Progress" if demand.researcher != "غير محدد" else "Pending"
-                    ),
-                }
-                for demand in demands
-            ]
-
-            json_data = json.dumps(demands_list, indent=4, ensure_ascii=False)
-
-            # Use BytesIO instead of writing to a file
-            json_bytes = io.BytesIO(json_data.encode("utf-8"))
-            json_bytes.seek(0)
-
-            file_name = f"{research}_demands.json"
+            spool = await self.db.run(
+                export_demands, guild_id, research, export_format, compress
+            )
+            file_name = export_filename(f"{research}_demands", export_format, compress)
             await interaction.followup.send(
-                file=discord.File(json_bytes, filename=file_name)
+                file=discord.File(spool, filename=file_name)
             )
             return
 
-        # Create embed if JSON export is not requested
-        embed = discord.Embed(
-            title=f"📂 Demands for Research: {research}",
-            description=f"Showing {len(demands)} demands.",
-            color=discord.Color.purple(),
-            timestamp=datetime.datetime.utcnow(),
-        )
+        # Show the demands one page at a time if export is not requested
+        paginator = KeysetPaginator(
+            interaction.user.id,
+            fetch=functools.partial(
+                self.db.run, repository.demand_page, guild_id, research
+            ),
+            render=functools.partial(demands_embed, research, total),
+            cache=cache,
+            research_id=research_id,
+            cache_key=("demands",),
+        )
+        embed = await paginator.start()
+        if paginator.has_next:
+            paginator.message = await interaction.followup.send(
+                embed=embed, view=paginator
+            )
+        else:
+            await interaction.followup.send(embed=embed)
 
-        embed.set_thumbnail(
-            url="https://cdn-icons-png.flaticon.com/512/1246/1246261.png"
-        )
-        embed.set_footer(text="Research Demands Overview")
-
-        for demand in demands:
-            deadline_str = (
-                demand.deadline.strftime("%Y-%m-%d %H:%M")
-                if demand.deadline
-                else "No Deadline"
-            )
-            researcher_str = (
-                demand.researcher if demand.researcher != "غير محدد" else False
-            )
-            status = "🟢" if researcher_str else "🟡 Pending (waiting for researcher)"
-
-            done = "🟢" if demand.done == True else "🔴"
-            embed.add_field(
-                name=f"🔹 {demand.demand}",
-                value=(
-                    f"**Added by:** {demand.added_by}\n"
-                    f"**Researcher:** {str(demand.researcher)}\n"
-                    f"**Deadline:** {deadline_str}\n"
-                    f"**Status:** {status}\n"
-                    f"**Done?**: {done}"
-                ),
-                inline=False,
+    @app_commands.command(name="research_status")
+    @app_commands.describe(research="اسم البحث (اتركه فارغًا لكل الأبحاث)")
+    @app_commands.autocomplete(research=research_autocomplete)
+    @commands.has_permissions(administrator=False)
+    async def research_status(
+        self, interaction: discord.Interaction, research: str = None
+    ):
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
+
+        try:
+            rows = await self.db.run(
+                repository.research_status, guild_id, utcnow(), research
+            )
+        except ResearchNotFound:
+            embed = discord.Embed(
+                title="❌ البحث غير موجود",
+                description=f"🔎 لم يتم العثور على بحث باسم:\n**{research}**",
+                color=discord.Color.red(),
             )
+            embed.set_footer(text="نظام إدارة الأبحاث")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
 
-        await interaction.followup.send(embed=embed)
+        if not rows:
+            await interaction.followup.send("📭 No research yet.", ephemeral=True)
+            return
+        await interaction.followup.send(embed=status_embed(rows), ephemeral=True)
 
     @app_commands.command(name="mark_demand_done")
     @app_commands.describe(research="اسم البحث", demand="المطلب المراد تعيينه كمكتمل")
@@ -543,16 +736,15 @@ class Demands(commands.Cog):
     async def mark_demand_done(
         self, interaction: discord.Interaction, research: str, demand: str
     ):
-        await interaction.response.defer()
-
-        # البحث عن البحث المطلوب
-        research_entry = (
-            session.query(Dbstruct.research)
-            .filter(Dbstruct.research.name == research)
-            .first()
-        )
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
 
-        if not research_entry:
+        # تحديث الحالة إلى مكتمل
+        try:
+            demand_id, deadline_dt = await self.db.write(
+                repository.set_demand_done, guild_id, research, demand, True
+            )
+        except ResearchNotFound:
             embed = discord.Embed(
                 title="❌ البحث غير موجود",
                 description=f"لم يتم العثور على بحث باسم:\n**{research}**",
@@ -561,18 +753,7 @@ class Demands(commands.Cog):
             embed.set_footer(text="نظام إدارة الأبحاث")
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
-
-        # البحث عن المطلب المطلوب
-        demand_entry = (
-            session.query(Dbstruct.demands)
-            .filter(
-                Dbstruct.demands.research_id == research_entry.id,
-                Dbstruct.demands.demand == demand,
-            )
-            .first()
-        )
-
-        if not demand_entry:
+        except DemandNotFound:
             embed = discord.Embed(
                 title="❌ المطلب غير موجود",
                 description=f"لم يتم العثور على المطلب:\n**{demand}** ضمن البحث **{research}**",
@@ -582,9 +763,8 @@ class Demands(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        # تحديث الحالة إلى مكتمل
-        demand_entry.done = True
-        session.commit()
+        self.bot.reminders.cancel(demand_id)
+        invalidate(self.bot, guild_id, research)
 
         # إنشاء Embed للنجاح
         embed = discord.Embed(
@@ -615,16 +795,15 @@ class Demands(commands.Cog):
     async def mark_demand_undone(
         self, interaction: discord.Interaction, research: str, demand: str
     ):
-        await interaction.response.defer()
-
-        # البحث عن البحث المطلوب
-        research_entry = (
-            session.query(Dbstruct.research)
-            .filter(Dbstruct.research.name == research)
-            .first()
-        )
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
 
-        if not research_entry:
+        # تحديث الحالة إلى غير مكتمل
+        try:
+            demand_id, deadline_dt = await self.db.write(
+                repository.set_demand_done, guild_id, research, demand, False
+            )
+        except ResearchNotFound:
             embed = discord.Embed(
                 title="❌ البحث غير موجود",
                 description=f"لم يتم العثور على بحث باسم:\n**{research}**",
@@ -633,18 +812,7 @@ class Demands(commands.Cog):
             embed.set_footer(text="نظام إدارة الأبحاث")
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
-
-        # البحث عن المطلب المطلوب
-        demand_entry = (
-            session.query(Dbstruct.demands)
-            .filter(
-                Dbstruct.demands.research_id == research_entry.id,
-                Dbstruct.demands.demand == demand,
-            )
-            .first()
-        )
-
-        if not demand_entry:
+        except DemandNotFound:
             embed = discord.Embed(
                 title="❌ المطلب غير موجود",
                 description=f"لم يتم العثور على المطلب:\n**{demand}** ضمن البحث **{research}**",
@@ -654,9 +822,8 @@ class Demands(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
-        # تحديث الحالة إلى غير مكتمل
-        demand_entry.done = False
-        session.commit()
+        self.bot.reminders.schedule(demand_id, deadline_dt)
+        invalidate(self.bot, guild_id, research)
 
         # إنشاء Embed للنجاح
         embed = discord.Embed(
@@ -0,0 +1,237 @@
+import asyncio
+import codecs
+import contextlib
+import logging
+import os
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+import aiohttp
+from discord.ext import commands
+from modules import netguard, repository
+from modules.resolver import LRUCache
+
+log = logging.getLogger(__name__)
+
+# Only the head of a page is parsed for its title.
+MAX_HTML_BYTES = 64 * 1024
+MAX_TITLE = 200
+
+
+@dataclass(frozen=True)
+class LinkMetadata:
+    """
+    What a link points to, as far as its response tells.
+
+    Attributes:
+        title (str, optional): The ``<title>`` of an HTML page.
+        content_type (str, optional): The media type from ``Content-Type``.
+        size (int, optional): The ``Content-Length`` in bytes.
+    """
+
+    title: str | None = None
+    content_type: str | None = None
+    size: int | None = None
+
+
+class _TitleParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.done = False
+        self._in_title = False
+        self._parts: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title" and not self.done:
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self._in_title:
+            self._in_title = False
+            self.done = True
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._parts.append(data)
+
+    @property
+    def title(self) -> str | None:
+        title = " ".join("".join(self._parts).split())
+        return title[:MAX_TITLE] or None
+
+
+def enrichment_options_from_env() -> dict:
+    """
+    Read ``ENRICH_CONCURRENCY``, ``ENRICH_PER_HOST`` and ``ENRICH_TIMEOUT``.
+    """
+    return {
+        "concurrency": int(os.environ.get("ENRICH_CONCURRENCY", "8")),
+        "per_host": int(os.environ.get("ENRICH_PER_HOST", "2")),
+        "timeout": float(os.environ.get("ENRICH_TIMEOUT", "10")),
+    }
+
+
+class LinkEnricher:
+    """
+    Fetches the title, media type and size of resource links in the background.
+
+    ``submit`` is called after a resource is inserted and returns immediately,
+    so the interaction never waits on a remote server. Every fetch goes through
+    one pooled ``aiohttp.ClientSession``; at most ``concurrency`` fetches run at
+    once and at most ``per_host`` of them against the same host. Results are
+    cached by URL, and concurrent fetches of the same URL share one request.
+    Links that fail to load are left as they are. Unless ``public_only`` is
+    turned off, links to loopback, private and other non-public addresses are
+    refused, at every redirect.
+
+    Args:
+        bot (commands.Bot): The bot whose database and render cache are updated.
+        concurrency (int): The maximum number of fetches in flight.
+        per_host (int): The maximum number of fetches in flight per host.
+        timeout (float): Seconds a single fetch may take, body included.
+        cache_size (int): The number of URLs whose metadata is kept.
+        cache_ttl (float): Seconds cached metadata stays valid.
+        public_only (bool): Whether links must go to public addresses.
+    """
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        concurrency: int = 8,
+        per_host: int = 2,
+        timeout: float = 10.0,
+        cache_size: int = 1024,
+        cache_ttl: float = 3600,
+        public_only: bool = True,
+    ) -> None:
+        self.bot = bot
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.public_only = public_only
+        self.cache = LRUCache(cache_size, cache_ttl)
+        self._session: aiohttp.ClientSession | None = None
+        self._slots = asyncio.Semaphore(concurrency)
+        # host -> [semaphore, number of fetches holding or waiting on it]
+        self._hosts: dict[str, list] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        self._session = netguard.client_session(
+            self.concurrency, self.per_host, self.timeout, self.public_only
+        )
+
+    async def close(self) -> None:
+        """
+        Cancel pending enrichments and close the HTTP session.
+        """
+        pending = [*self._tasks, *self._inflight.values()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def submit(self, resource_id: int, link: str) -> None:
+        """
+        Enrich a newly added resource in the background.
+        """
+        if self._session is None:
+            return
+        task = asyncio.create_task(self._enrich(resource_id, link))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _enrich(self, resource_id: int, link: str) -> None:
+        try:
+            metadata = await self.fetch(link)
+            if metadata is None:
+                return
+            research_id = await self.bot.db.write(
+                repository.set_resource_metadata,
+                resource_id,
+                metadata.title,
+                metadata.content_type,
+                metadata.size,
+            )
+            if research_id is not None:
+                self.bot.render_cache.bump(research_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("Failed to enrich resource %s", resource_id)
+
+    async def fetch(self, url: str) -> LinkMetadata | None:
+        """
+        Return the metadata of ``url``, or None if it could not be loaded.
+        """
+        metadata = self.cache.get(url)
+        if metadata is not None:
+            return metadata
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._fetch(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        # A cancelled caller must not cancel the request other callers share.
+        return await asyncio.shield(task)
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, host: str):
+        # Wait for the host before taking a global slot, so a busy host does
+        # not hold slots other hosts could use.
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.per_host), 0]
+        entry[1] += 1
+        try:
+            async with entry[0], self._slots:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._hosts[host]
+
+    async def _fetch(self, url: str) -> LinkMetadata | None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return None
+        try:
+            async with self._slot(parts.hostname):
+                async with netguard.request(
+                    self._session, "GET", url, public_only=self.public_only
+                ) as response:
+                    if response.status >= 400:
+                        return None
+                    content_type = (
+                        response.content_type
+                        if "Content-Type" in response.headers
+                        else None
+                    )
+                    title = None
+                    if content_type in ("text/html", "application/xhtml+xml"):
+                        title = await self._read_title(response)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+            log.info("Could not fetch %s: %r", url, error)
+            return None
+        metadata = LinkMetadata(title, content_type, response.content_length)
+        self.cache.set(url, metadata)
+        return metadata
+
+    @staticmethod
+    async def _read_title(response: aiohttp.ClientResponse) -> str | None:
+        parser = _TitleParser()
+        try:
+            decoder = codecs.getincrementaldecoder(response.charset or "utf-8")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")
+        decoder = decoder(errors="replace")
+        read = 0
+        async for chunk in response.content.iter_chunked(8192):
+            read += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done or read >= MAX_HTML_BYTES:
+                break
+        return parser.title
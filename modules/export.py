@@ -0,0 +1,126 @@
+import csv
+import gzip
+import io
+import json
+import tempfile
+from typing import Iterable, Literal
+from sqlalchemy.orm import Session
+from modules import repository
+
+ExportFormat = Literal["json", "jsonl", "csv"]
+
+# Exports larger than this spill from memory to a temporary file on disk.
+SPOOL_THRESHOLD = 8 * 1024 * 1024
+
+
+def write_export(
+    rows: Iterable[dict], fields: list[str], fmt: ExportFormat, compress: bool
+) -> tempfile.SpooledTemporaryFile:
+    """
+    Serialize rows one at a time into a spooled temporary file.
+
+    Only the row being written is held in memory; the output stays in memory up
+    to ``SPOOL_THRESHOLD`` bytes and is moved to disk beyond that.
+
+    Args:
+        rows (Iterable[dict]): The rows to write, consumed lazily.
+        fields (list[str]): The keys of every row, in column order for CSV.
+        fmt (ExportFormat): ``"json"`` for one JSON array, ``"jsonl"`` for one
+            object per line or ``"csv"``.
+        compress (bool): Gzip the output.
+
+    Returns:
+        tempfile.SpooledTemporaryFile: The export, rewound to the start.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_THRESHOLD)
+    binary = gzip.GzipFile(fileobj=spool, mode="wb") if compress else spool
+    text = io.TextIOWrapper(binary, encoding="utf-8", newline="")
+
+    if fmt == "csv":
+        writer = csv.DictWriter(text, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    elif fmt == "jsonl":
+        for row in rows:
+            text.write(json.dumps(row, ensure_ascii=False))
+            text.write("\n")
+    else:
+        separator = "[\n"
+        for row in rows:
+            text.write(separator)
+            text.write(json.dumps(row, ensure_ascii=False))
+            separator = ",\n"
+        text.write("[]\n" if separator == "[\n" else "\n]\n")
+
+    text.flush()
+    text.detach()
+    if compress:
+        # Closing the GzipFile writes the trailer but leaves ``spool`` open.
+        binary.close()
+    spool.seek(0)
+    return spool
+
+
+def export_filename(name: str, fmt: ExportFormat, compress: bool) -> str:
+    return f"{name}.{fmt}" + (".gz" if compress else "")
+
+
+DEMAND_FIELDS = ["demand", "added_by", "researcher", "deadline", "status"]
+
+
+def export_demands(
+    session: Session, guild_id: int, research: str, fmt: ExportFormat, compress: bool
+) -> tempfile.SpooledTemporaryFile:
+    """
+    Export every demand of a research.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+    """
+    rows = (
+        {
+            "demand": demand.demand,
+            "added_by": demand.added_by,
+            "researcher": demand.researcher,
+            "deadline": (
+                demand.deadline.strftime("%Y-%m-%d %H:%M")
+                if demand.deadline
+                else "No Deadline"
+            ),
+            "status": (
+                "In Progress"
+                if demand.researcher != repository.UNASSIGNED
+                else "Pending"
+            ),
+        }
+        for demand in repository.stream_demands(session, guild_id, research)
+    )
+    return write_export(rows, DEMAND_FIELDS, fmt, compress)
+
+
+RESOURCE_FIELDS = ["Resource Name", "Link", "Added By", "Status", "Added At"]
+
+
+def export_resources(
+    session: Session,
+    guild_id: int,
+    research: str | None,
+    demand: str | None,
+    fmt: ExportFormat,
+    compress: bool,
+) -> tempfile.SpooledTemporaryFile:
+    rows = (
+        {
+            "Resource Name": res.resource_name,
+            "Link": res.resource_link,
+            "Added By": res.added_by,
+            "Status": "Read" if res.is_read else "Unread",
+            "Added At": (
+                res.added_at.strftime("%Y-%m-%d %H:%M:%S")
+                if res.added_at
+                else "Unknown"
+            ),
+        }
+        for res in repository.stream_resources(session, guild_id, research, demand)
+    )
+    return write_export(rows, RESOURCE_FIELDS, fmt, compress)
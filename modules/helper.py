@@ -1,3 +1,4 @@
+import datetime
 import discord
 
 
@@ -17,3 +18,71 @@ async def create_embed(title: str, content: str, color: discord.Color):
     embed.add_field(name=content, value="")
     embed.set_footer(text="if you think something is wrong, please open a ticket")
     return embed
+
+
+# Keeps the import report well inside Discord's embed description limit.
+MAX_REPORTED_ERRORS = 15
+
+
+def import_report_embed(inserted: int, errors: list[tuple[int, str]]):
+    """
+    Create the embed summarising a bulk import.
+
+    Args:
+        inserted (int): The number of rows that were added.
+        errors (list[tuple[int, str]]): ``(row number, reason)`` of skipped rows.
+
+    Returns:
+        discord.Embed: The created embed.
+    """
+    embed = discord.Embed(
+        title="📥 نتيجة الاستيراد",
+        description=f"✅ تمت إضافة **{inserted}** صف\n❌ تم تخطي **{len(errors)}** صف",
+        color=discord.Color.green() if not errors else discord.Color.orange(),
+        timestamp=discord.utils.utcnow(),
+    )
+    if errors:
+        lines = [f"row {number}: {reason}" for number, reason in errors]
+        if len(lines) > MAX_REPORTED_ERRORS:
+            hidden = len(lines) - MAX_REPORTED_ERRORS
+            lines = lines[:MAX_REPORTED_ERRORS] + [f"... and {hidden} more"]
+        embed.add_field(name="Errors", value="\n".join(lines)[:1024], inline=False)
+    embed.set_footer(text="نظام إدارة الأبحاث")
+    return embed
+
+
+def split_list(text: str | None) -> list[str]:
+    """
+    Split a comma separated command option into its non-empty items.
+
+    Args:
+        text (str, optional): The option value.
+
+    Returns:
+        list[str]: The stripped items, empty if ``text`` is empty or None.
+    """
+    return [item.strip() for item in (text or "").split(",") if item.strip()]
+
+
+def guild_scope(interaction: discord.Interaction) -> int:
+    """
+    Return the guild whose research an interaction works on.
+
+    Args:
+        interaction (discord.Interaction): The interaction.
+
+    Returns:
+        int: The guild id, or 0 for interactions in direct messages.
+    """
+    return interaction.guild_id or 0
+
+
+def utcnow() -> datetime.datetime:
+    """
+    Return the current time as a naive UTC datetime, like the stored deadlines
+    and check times.
+
+    Returns:
+        datetime.datetime: The current UTC time without tzinfo.
+    """
+    return discord.utils.utcnow().replace(tzinfo=None)
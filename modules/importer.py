@@ -0,0 +1,171 @@
+import csv
+import datetime
+import io
+import json
+from dataclasses import dataclass, field
+from sqlalchemy.orm import Session
+from modules import repository
+
+
+class ImportFileError(Exception):
+    """
+    Raised when an uploaded file cannot be read as CSV, JSON or JSON Lines.
+    """
+
+
+@dataclass
+class ImportResult:
+    """
+    The outcome of a bulk import.
+
+    Attributes:
+        inserted (list): The rows returned by the bulk insert.
+        errors (list[tuple[int, str]]): ``(row number, reason)`` for every row
+            that was skipped, numbered from 1.
+    """
+
+    inserted: list = field(default_factory=list)
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+def parse_rows(data: bytes, filename: str) -> list[dict]:
+    """
+    Read the rows of an uploaded CSV, JSON array or JSON Lines file.
+
+    Raises:
+        ImportFileError: If the file is not valid for its extension.
+    """
+    try:
+        text = data.decode("utf-8-sig")
+        if filename.lower().endswith(".csv"):
+            return list(csv.DictReader(io.StringIO(text)))
+        if filename.lower().endswith(".jsonl"):
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+        if filename.lower().endswith(".json"):
+            rows = json.loads(text)
+            if not isinstance(rows, list):
+                raise ImportFileError("a JSON file must hold a list of objects")
+            return rows
+    except (UnicodeDecodeError, json.JSONDecodeError, csv.Error) as error:
+        raise ImportFileError(str(error)) from error
+    raise ImportFileError("only .csv, .json and .jsonl files are supported")
+
+
+def _text(row, key: str) -> str:
+    value = row.get(key) if isinstance(row, dict) else None
+    return str(value).strip() if value is not None else ""
+
+
+def import_demands(
+    session: Session, guild_id: int, data: bytes, filename: str, added_by: str
+) -> ImportResult:
+    """
+    Validate and insert demands from an uploaded file in one transaction.
+
+    Research names are looked up in ``guild_id`` only.
+
+    Each row needs ``research`` and ``demand``; ``researcher`` and ``deadline``
+    (``YYYY-MM-DD HH:MM``) are optional. Research names are resolved with one
+    batched query and valid rows are inserted with one executemany.
+
+    Raises:
+        ImportFileError: If the file cannot be parsed.
+    """
+    rows = parse_rows(data, filename)
+    result = ImportResult()
+    known = repository.research_ids(
+        session, guild_id, {_text(row, "research") for row in rows} - {""}
+    )
+
+    values = []
+    for number, row in enumerate(rows, start=1):
+        research, demand = _text(row, "research"), _text(row, "demand")
+        if not research or not demand:
+            result.errors.append((number, "research and demand are required"))
+            continue
+        if research not in known:
+            result.errors.append((number, f"unknown research '{research}'"))
+            continue
+        deadline = _text(row, "deadline")
+        try:
+            deadline_dt = (
+                datetime.datetime.strptime(deadline, "%Y-%m-%d %H:%M")
+                if deadline
+                else None
+            )
+        except ValueError:
+            result.errors.append((number, f"bad deadline '{deadline}'"))
+            continue
+        values.append(
+            {
+                "research_id": known[research],
+                "guild_id": guild_id,
+                "demand": demand,
+                "added_by": added_by,
+                "researcher": _text(row, "researcher") or repository.UNASSIGNED,
+                "deadline": deadline_dt,
+            }
+        )
+
+    result.inserted = repository.bulk_add_demands(session, values)
+    return result
+
+
+def import_resources(
+    session: Session, guild_id: int, data: bytes, filename: str, added_by: str
+) -> ImportResult:
+    """
+    Validate and insert resources from an uploaded file in one transaction.
+
+    Research names are looked up in ``guild_id`` only.
+
+    Each row needs ``title``, ``research``, ``demand`` and ``link``. Research
+    names and ``(research, demand)`` pairs are each resolved with one batched
+    query and valid rows are inserted with one executemany.
+
+    Raises:
+        ImportFileError: If the file cannot be parsed.
+    """
+    rows = parse_rows(data, filename)
+    result = ImportResult()
+    known_research = repository.research_ids(
+        session, guild_id, {_text(row, "research") for row in rows} - {""}
+    )
+    known_demands = repository.demand_ids(
+        session,
+        {
+            (known_research[_text(row, "research")], _text(row, "demand"))
+            for row in rows
+            if _text(row, "research") in known_research
+        },
+    )
+
+    values = []
+    for number, row in enumerate(rows, start=1):
+        title, research = _text(row, "title"), _text(row, "research")
+        demand, link = _text(row, "demand"), _text(row, "link")
+        if not (title and research and demand and link):
+            result.errors.append(
+                (number, "title, research, demand and link are required")
+            )
+            continue
+        if research not in known_research:
+            result.errors.append((number, f"unknown research '{research}'"))
+            continue
+        research_id = known_research[research]
+        if (research_id, demand) not in known_demands:
+            result.errors.append((number, f"unknown demand '{demand}'"))
+            continue
+        values.append(
+            {
+                "resource_name": f"{title} - {demand} ",
+                "resource_link": link,
+                "research_id": research_id,
+                "guild_id": guild_id,
+                "demand_id": known_demands[(research_id, demand)],
+                "added_by": added_by,
+            }
+        )
+
+    result.inserted = repository.bulk_add_resources(session, values)
+    return result
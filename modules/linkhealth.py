@@ -0,0 +1,204 @@
+import asyncio
+import datetime
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+import aiohttp
+from discord.ext import commands, tasks
+from modules import netguard, repository
+from modules.helper import utcnow
+
+log = logging.getLogger(__name__)
+
+# Servers that refuse HEAD are retried with a GET whose body is not read.
+HEAD_REFUSED = (405, 501)
+
+
+def link_check_options_from_env() -> dict:
+    """
+    Read the link checker settings, e.g. ``LINK_CHECK_INTERVAL_MINUTES=30``.
+    """
+    return {
+        "interval": float(os.environ.get("LINK_CHECK_INTERVAL_MINUTES", "60")),
+        "recheck_after": datetime.timedelta(
+            hours=float(os.environ.get("LINK_RECHECK_HOURS", "24"))
+        ),
+        "batch_size": int(os.environ.get("LINK_CHECK_BATCH", "100")),
+        "concurrency": int(os.environ.get("LINK_CHECK_CONCURRENCY", "8")),
+        "host_interval": float(os.environ.get("LINK_CHECK_HOST_INTERVAL", "1")),
+        "timeout": float(os.environ.get("LINK_CHECK_TIMEOUT", "10")),
+    }
+
+
+class HostRateLimiter:
+    """
+    Spaces requests to the same host at least ``interval`` seconds apart.
+
+    Every caller reserves the next free start time of its host and sleeps until
+    then, so waiting callers are served in order without polling.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._next: dict[str, float] = {}
+
+    async def wait(self, host: str) -> None:
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next.get(host, now))
+        self._next[host] = start + self.interval
+        if len(self._next) > 1024:
+            self._next = {key: at for key, at in self._next.items() if at > now}
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class LinkHealthChecker:
+    """
+    Periodically checks that resource links still load.
+
+    Every ``interval`` minutes, the links not checked within ``recheck_after``
+    are read in batches, never-checked links first. Each link gets a HEAD
+    request that sends the stored ``ETag``/``Last-Modified`` back as
+    ``If-None-Match``/``If-Modified-Since``, so unchanged pages answer 304
+    without a body. Statuses of 400 and above and unreachable hosts count as
+    failures; ``/dead_links`` lists links whose latest check failed. Unless
+    ``public_only`` is turned off, links to non-public addresses are refused
+    at every redirect and count as unreachable.
+
+    Args:
+        bot (commands.Bot): The bot whose database and render cache are updated.
+        interval (float): Minutes between checking rounds.
+        recheck_after (datetime.timedelta): How long a check stays fresh.
+        batch_size (int): The number of links read and written at once.
+        concurrency (int): The maximum number of requests in flight.
+        host_interval (float): Minimum seconds between requests to one host.
+        timeout (float): Seconds a single request may take.
+        public_only (bool): Whether links must go to public addresses.
+    """
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        interval: float = 60,
+        recheck_after: datetime.timedelta = datetime.timedelta(hours=24),
+        batch_size: int = 100,
+        concurrency: int = 8,
+        host_interval: float = 1.0,
+        timeout: float = 10.0,
+        public_only: bool = True,
+    ) -> None:
+        self.bot = bot
+        self.interval = interval
+        self.recheck_after = recheck_after
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.public_only = public_only
+        self.rate_limiter = HostRateLimiter(host_interval)
+        self._slots = asyncio.Semaphore(concurrency)
+        self._session: aiohttp.ClientSession | None = None
+
+    def start(self) -> None:
+        self._session = netguard.client_session(
+            self.concurrency, timeout=self.timeout, public_only=self.public_only
+        )
+        self.check_links.change_interval(minutes=self.interval)
+        self.check_links.start()
+
+    async def stop(self) -> None:
+        self.check_links.cancel()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @tasks.loop(minutes=60)
+    async def check_links(self):
+        try:
+            await self.run_once()
+        except Exception:
+            log.exception("Link health check failed")
+
+    @check_links.before_loop
+    async def before_check_links(self):
+        await self.bot.wait_until_ready()
+
+    async def run_once(self) -> int:
+        """
+        Check every link that is due, one batch at a time.
+
+        Returns:
+            int: The number of links checked.
+        """
+        # Checks are stamped with the start of the round, which is always
+        # after checked_before, so no link is checked twice in one round.
+        started = utcnow()
+        checked_before = started - self.recheck_after
+        checked = 0
+        while True:
+            rows = await self.bot.db.run(
+                repository.links_to_check, checked_before, self.batch_size
+            )
+            if not rows:
+                break
+            checks = await asyncio.gather(*(self._check(row) for row in rows))
+            await self.bot.db.write(repository.record_link_checks, checks, started)
+            checked += len(rows)
+            for row, check in zip(rows, checks):
+                # Only a link turning dead or alive changes a rendered page.
+                if (row.link_failures > 0) != (check["link_failures"] > 0):
+                    self.bot.render_cache.bump(row.research_id)
+            if len(rows) < self.batch_size:
+                break
+        return checked
+
+    async def _check(self, row) -> dict:
+        check = {
+            "resource_id": row.id,
+            "link_status": None,
+            "link_latency_ms": None,
+            "link_etag": row.link_etag,
+            "link_last_modified": row.link_last_modified,
+            "link_failures": row.link_failures,
+        }
+        parts = urlsplit(row.resource_link)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            return check
+
+        headers = {}
+        if row.link_etag:
+            headers["If-None-Match"] = row.link_etag
+        if row.link_last_modified:
+            headers["If-Modified-Since"] = row.link_last_modified
+        try:
+            for method in ("HEAD", "GET"):
+                # Take a slot only once the host allows the request, so a
+                # rate-limited host does not hold slots other hosts could use.
+                await self.rate_limiter.wait(parts.hostname)
+                async with self._slots:
+                    started = time.perf_counter()
+                    try:
+                        status, response_headers = await self._request(
+                            method, row.resource_link, headers
+                        )
+                    finally:
+                        latency = time.perf_counter() - started
+                if status not in HEAD_REFUSED:
+                    break
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+            log.debug("Could not reach %s: %r", row.resource_link, error)
+            status, response_headers = 0, {}
+
+        check["link_status"] = status
+        check["link_latency_ms"] = round(latency * 1000)
+        if 200 <= status < 300:
+            check["link_etag"] = response_headers.get("ETag")
+            check["link_last_modified"] = response_headers.get("Last-Modified")
+        check["link_failures"] = 0 if 0 < status < 400 else row.link_failures + 1
+        return check
+
+    async def _request(self, method: str, url: str, headers: dict):
+        async with netguard.request(
+            self._session, method, url, headers, self.public_only
+        ) as response:
+            return response.status, response.headers
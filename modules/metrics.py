@@ -0,0 +1,245 @@
+import contextvars
+import functools
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from aiohttp import web
+import discord
+from discord.ext import commands
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+@dataclass
+class Invocation:
+    """
+    What one app command invocation has done so far.
+
+    Lives in a context variable, which ``BotDb.run`` carries onto its worker
+    threads, so the engine listeners can charge queries to the command.
+    """
+
+    command: str
+    started: float
+    queries: int = 0
+    db_seconds: float = 0.0
+    deferred: float | None = None
+    statements: dict[str, int] = field(default_factory=dict)
+
+
+current_invocation: contextvars.ContextVar[Invocation | None] = contextvars.ContextVar(
+    "current_invocation", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """
+    A Prometheus histogram with a single ``command`` label.
+    """
+
+    def __init__(self, name: str, documentation: str, buckets: tuple) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._series: dict[str, list] = {}
+
+    def observe(self, command: str, value: float) -> None:
+        series = self._series.setdefault(command, [[0] * (len(self.buckets) + 1), 0.0])
+        counts = series[0]
+        # Buckets are cumulative: every bound at or above the value counts it.
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+        counts[-1] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for command, (counts, total) in sorted(self._series.items()):
+            label = f'command="{_escape(command)}"'
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {counts[-1]}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {counts[-1]}")
+        return lines
+
+
+class Counter:
+    """
+    A Prometheus counter with a single ``command`` label.
+    """
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._series: dict[str, int] = {}
+
+    def inc(self, command: str) -> None:
+        self._series[command] = self._series.get(command, 0) + 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for command, value in sorted(self._series.items()):
+            lines.append(f'{self.name}{{command="{_escape(command)}"}} {value}')
+        return lines
+
+
+def metrics_address_from_env() -> tuple[str, int] | None:
+    """
+    Read where to serve ``/metrics`` from ``METRICS_HOST`` and ``METRICS_PORT``.
+
+    Returns:
+        tuple[str, int] | None: The address, or None when ``METRICS_PORT`` is
+        unset and the endpoint is disabled.
+    """
+    port = os.environ.get("METRICS_PORT")
+    if not port:
+        return None
+    return os.environ.get("METRICS_HOST", "127.0.0.1"), int(port)
+
+
+class CommandMetrics:
+    """
+    Per-command latency, database and error metrics in Prometheus format.
+
+    ``instrument`` wraps every app command of a cog; ``track`` counts and times
+    the statements an engine runs on behalf of the command being handled.
+    """
+
+    def __init__(self) -> None:
+        self.latency = Histogram(
+            "bot_command_duration_seconds",
+            "Time spent in app command handlers.",
+            LATENCY_BUCKETS,
+        )
+        self.defer_latency = Histogram(
+            "bot_command_defer_seconds",
+            "Time from the start of a handler until it deferred its response.",
+            LATENCY_BUCKETS,
+        )
+        self.queries = Histogram(
+            "bot_command_db_queries",
+            "Database statements issued per command invocation.",
+            QUERY_BUCKETS,
+        )
+        self.db_time = Histogram(
+            "bot_command_db_duration_seconds",
+            "Time spent executing database statements per command invocation.",
+            LATENCY_BUCKETS,
+        )
+        self.errors = Counter(
+            "bot_command_errors_total",
+            "App command invocations that raised an exception.",
+        )
+        self._runner: web.AppRunner | None = None
+
+    def instrument(self, cog: commands.Cog) -> None:
+        """
+        Wrap the callback of every app command in ``cog``.
+        """
+        for command in cog.walk_app_commands():
+            if isinstance(command, discord.app_commands.Command):
+                command._callback = self._wrap(
+                    command.qualified_name, command._callback
+                )
+
+    def _wrap(self, name: str, callback):
+        @functools.wraps(callback)
+        async def wrapper(*args, **kwargs):
+            invocation = Invocation(name, time.perf_counter())
+            token = current_invocation.set(invocation)
+            try:
+                return await callback(*args, **kwargs)
+            except Exception:
+                self.errors.inc(name)
+                raise
+            finally:
+                current_invocation.reset(token)
+                self.latency.observe(name, time.perf_counter() - invocation.started)
+                self.queries.observe(name, invocation.queries)
+                self.db_time.observe(name, invocation.db_seconds)
+                if invocation.deferred is not None:
+                    self.defer_latency.observe(name, invocation.deferred)
+
+        return wrapper
+
+    def track(self, engine: Engine) -> None:
+        """
+        Charge the statements ``engine`` runs to the current invocation.
+        """
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["metrics_started"].pop()
+            invocation = current_invocation.get()
+            if invocation is not None:
+                invocation.queries += 1
+                invocation.db_seconds += time.perf_counter() - started
+
+    def render(self) -> str:
+        lines = []
+        for metric in (
+            self.latency,
+            self.defer_latency,
+            self.queries,
+            self.db_time,
+            self.errors,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=self.render(), content_type="text/plain", charset="utf-8"
+        )
+
+    async def start_server(self, host: str, port: int) -> None:
+        """
+        Serve ``GET /metrics`` on ``host:port``.
+        """
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        log.info("Serving metrics on http://%s:%s/metrics", host, port)
+
+    async def stop_server(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def defer(interaction: discord.Interaction, **kwargs) -> None:
+    """
+    Defer the response, recording how long the command took to get there.
+
+    Args:
+        interaction (discord.Interaction): The interaction to defer.
+        **kwargs: Passed on to ``InteractionResponse.defer``.
+    """
+    await interaction.response.defer(**kwargs)
+    invocation = current_invocation.get()
+    if invocation is not None:
+        invocation.deferred = time.perf_counter() - invocation.started
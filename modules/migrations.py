@@ -0,0 +1,273 @@
+"""
+Versioned, in-place upgrades for existing database files.
+
+``base.metadata.create_all`` only creates missing tables, so any change to an
+existing table (new indexes, constraints or columns) is shipped here as a
+numbered migration. Every migration must be idempotent: a fresh database gets
+the current schema from ``create_all`` and then runs the same migrations, which
+must then change nothing.
+"""
+
+from sqlalchemy import Column, Integer, MetaData, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# The guild of rows created before guilds were tracked. Guild ids are
+# positive and direct messages use 0, so no interaction can produce it.
+UNSCOPED_GUILD = -1
+# The researcher stored for demands nobody has taken yet.
+UNASSIGNED = "غير محدد"
+
+_version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    _version_metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+def _lookup_indexes(connection: Connection) -> None:
+    # Research names must be unique before the unique index can be built, so
+    # later duplicates are renamed to "<name> (<id>)".
+    connection.exec_driver_sql(
+        "UPDATE research SET name = name || ' (' || id || ')' "
+        "WHERE id NOT IN (SELECT MIN(id) FROM research GROUP BY name)"
+    )
+    for statement in (
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_research_name ON research (name)",
+        "CREATE INDEX IF NOT EXISTS ix_demands_research_id_demand "
+        "ON demands (research_id, demand)",
+        "CREATE INDEX IF NOT EXISTS ix_demands_demand ON demands (demand)",
+        "CREATE INDEX IF NOT EXISTS ix_demands_researcher ON demands (researcher)",
+        "CREATE INDEX IF NOT EXISTS ix_demands_deadline ON demands (deadline)",
+        "CREATE INDEX IF NOT EXISTS ix_resources_research_id "
+        "ON resources (research_id)",
+        "CREATE INDEX IF NOT EXISTS ix_resources_demand_id ON resources (demand_id)",
+        "CREATE INDEX IF NOT EXISTS ix_resources_added_at ON resources (added_at)",
+    ):
+        connection.exec_driver_sql(statement)
+
+
+def _search_index(connection: Connection) -> None:
+    # Resources and demands share one FTS5 table. The rowid encodes the source
+    # row (resources: 2 * id, demands: 2 * key_id + 1) so triggers can update
+    # and delete entries by rowid instead of scanning the index.
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "title, link, research_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+        "CREATE TRIGGER IF NOT EXISTS resources_search_insert "
+        "AFTER INSERT ON resources BEGIN "
+        "INSERT INTO search_index (rowid, title, link, research_id) "
+        "VALUES (2 * new.id, new.resource_name, new.resource_link, new.research_id); "
+        "END",
+        "CREATE TRIGGER IF NOT EXISTS resources_search_delete "
+        "AFTER DELETE ON resources BEGIN "
+        "DELETE FROM search_index WHERE rowid = 2 * old.id; "
+        "END",
+        "CREATE TRIGGER IF NOT EXISTS resources_search_update "
+        "AFTER UPDATE OF resource_name, resource_link, research_id ON resources BEGIN "
+        "DELETE FROM search_index WHERE rowid = 2 * old.id; "
+        "INSERT INTO search_index (rowid, title, link, research_id) "
+        "VALUES (2 * new.id, new.resource_name, new.resource_link, new.research_id); "
+        "END",
+        "CREATE TRIGGER IF NOT EXISTS demands_search_insert "
+        "AFTER INSERT ON demands BEGIN "
+        "INSERT INTO search_index (rowid, title, research_id) "
+        "VALUES (2 * new.key_id + 1, new.demand, new.research_id); "
+        "END",
+        "CREATE TRIGGER IF NOT EXISTS demands_search_delete "
+        "AFTER DELETE ON demands BEGIN "
+        "DELETE FROM search_index WHERE rowid = 2 * old.key_id + 1; "
+        "END",
+        "CREATE TRIGGER IF NOT EXISTS demands_search_update "
+        "AFTER UPDATE OF demand, research_id ON demands BEGIN "
+        "DELETE FROM search_index WHERE rowid = 2 * old.key_id + 1; "
+        "INSERT INTO search_index (rowid, title, research_id) "
+        "VALUES (2 * new.key_id + 1, new.demand, new.research_id); "
+        "END",
+        "DELETE FROM search_index",
+        "INSERT INTO search_index (rowid, title, link, research_id) "
+        "SELECT 2 * id, resource_name, resource_link, research_id FROM resources",
+        "INSERT INTO search_index (rowid, title, research_id) "
+        "SELECT 2 * key_id + 1, demand, research_id FROM demands",
+    ):
+        connection.exec_driver_sql(statement)
+
+
+def _postgresql_search_index(connection: Connection) -> None:
+    # PostgreSQL has no FTS5; search uses GIN indexes over the same tsvector
+    # expressions that repository.search matches against.
+    if connection.dialect.name != "postgresql":
+        return
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_resources_search ON resources USING gin "
+        "(to_tsvector('simple', resource_name || ' ' || resource_link))",
+        "CREATE INDEX IF NOT EXISTS ix_demands_search ON demands USING gin "
+        "(to_tsvector('simple', coalesce(demand, '')))",
+    ):
+        connection.exec_driver_sql(statement)
+
+
+def _guild_partitioning(connection: Connection) -> None:
+    # Rows created before guilds were tracked belong to UNSCOPED_GUILD until
+    # claimed with LEGACY_GUILD_ID. Demands and resources carry their
+    # research's guild so per-guild lookups never need a join.
+    inspector = inspect(connection)
+    for table in ("research", "demands", "resources"):
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "guild_id" not in columns:
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table} ADD COLUMN guild_id BIGINT NOT NULL DEFAULT 0"
+            )
+            connection.exec_driver_sql(
+                f"UPDATE {table} SET guild_id = {UNSCOPED_GUILD}"
+            )
+    for statement in (
+        "DROP INDEX IF EXISTS uq_research_name",
+        "DROP INDEX IF EXISTS ix_demands_demand",
+        "DROP INDEX IF EXISTS ix_demands_researcher",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_research_guild_name "
+        "ON research (guild_id, name)",
+        "CREATE INDEX IF NOT EXISTS ix_demands_guild_demand "
+        "ON demands (guild_id, demand)",
+        "CREATE INDEX IF NOT EXISTS ix_demands_guild_researcher "
+        "ON demands (guild_id, researcher)",
+        "CREATE INDEX IF NOT EXISTS ix_resources_guild_id ON resources (guild_id, id)",
+    ):
+        connection.exec_driver_sql(statement)
+
+
+def rebuild_research_counters(connection: Connection) -> None:
+    """
+    Recompute ``research_counters`` from the demands and resources tables.
+
+    The write functions of ``repository`` keep the counters current; this is
+    only needed for rows written around them, e.g. by a migration or seeding.
+    """
+    connection.exec_driver_sql("DELETE FROM research_counters")
+    connection.execute(
+        text(
+            "INSERT INTO research_counters "
+            "(research_id, demands, assigned, done, resources, read_resources) "
+            "SELECT research.id, "
+            "(SELECT COUNT(*) FROM demands WHERE research_id = research.id), "
+            "(SELECT COUNT(*) FROM demands WHERE research_id = research.id "
+            "AND researcher IS NOT NULL AND researcher <> :unassigned), "
+            "(SELECT COUNT(*) FROM demands WHERE research_id = research.id "
+            "AND done = TRUE), "
+            "(SELECT COUNT(*) FROM resources WHERE research_id = research.id), "
+            "(SELECT COUNT(*) FROM resources WHERE research_id = research.id "
+            "AND is_read = TRUE) "
+            "FROM research"
+        ),
+        {"unassigned": UNASSIGNED},
+    )
+
+
+def _research_counters(connection: Connection) -> None:
+    # The table itself comes from create_all; the partial index matches the
+    # dialect's rendering of ``done.is_not(True)`` so the planner can use it.
+    done = "TRUE" if connection.dialect.name == "postgresql" else "1"
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_demands_open_deadline "
+        f"ON demands (research_id, deadline) WHERE done IS NOT {done}"
+    )
+    rebuild_research_counters(connection)
+
+
+def _add_missing_columns(
+    connection: Connection, table: str, columns: list[tuple[str, str]]
+) -> None:
+    existing = {column["name"] for column in inspect(connection).get_columns(table)}
+    for name, definition in columns:
+        if name not in existing:
+            connection.exec_driver_sql(
+                f"ALTER TABLE {table} ADD COLUMN {name} {definition}"
+            )
+
+
+def _link_metadata(connection: Connection) -> None:
+    _add_missing_columns(
+        connection,
+        "resources",
+        [
+            ("link_title", "VARCHAR"),
+            ("content_type", "VARCHAR"),
+            ("content_length", "BIGINT"),
+            ("enriched_at", "TIMESTAMP"),
+        ],
+    )
+
+
+def _link_health(connection: Connection) -> None:
+    _add_missing_columns(
+        connection,
+        "resources",
+        [
+            ("link_status", "INTEGER"),
+            ("link_latency_ms", "INTEGER"),
+            ("link_etag", "VARCHAR"),
+            ("link_last_modified", "VARCHAR"),
+            ("link_failures", "INTEGER NOT NULL DEFAULT 0"),
+            ("link_checked_at", "TIMESTAMP"),
+        ],
+    )
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_resources_link_checked_at "
+        "ON resources (link_checked_at)",
+        "CREATE INDEX IF NOT EXISTS ix_resources_dead_links "
+        "ON resources (guild_id, id) WHERE link_failures > 0",
+    ):
+        connection.exec_driver_sql(statement)
+
+
+# (version, description, migration) in the order they must be applied.
+MIGRATIONS = [
+    (1, "lookup indexes and unique research names", _lookup_indexes),
+    (2, "full-text search index over resources and demands", _search_index),
+    (3, "full-text search indexes on PostgreSQL", _postgresql_search_index),
+    (4, "guild_id on every table and guild-leading indexes", _guild_partitioning),
+    (5, "per-research progress counters", _research_counters),
+    (6, "fetched link metadata on resources", _link_metadata),
+    (7, "link health checks on resources", _link_health),
+]
+
+
+def current_version(connection: Connection) -> int:
+    """
+    Return the schema version recorded in the database, or 0 if none is.
+    """
+    return connection.scalar(select(schema_version.c.version)) or 0
+
+
+def upgrade(engine: Engine, metadata: MetaData) -> list[int]:
+    """
+    Create missing tables and apply every pending migration.
+
+    Each migration runs in its own transaction together with the version bump,
+    so an interrupted upgrade resumes from the last completed step.
+
+    Args:
+        engine (Engine): The engine to upgrade.
+        metadata (MetaData): The metadata describing the current schema.
+
+    Returns:
+        list[int]: The versions that were applied.
+    """
+    with engine.begin() as connection:
+        metadata.create_all(bind=connection)
+        _version_metadata.create_all(bind=connection)
+        if connection.scalar(select(schema_version.c.version)) is None:
+            connection.execute(schema_version.insert().values(version=0))
+
+    applied = []
+    for version, _description, migration in MIGRATIONS:
+        with engine.begin() as connection:
+            if current_version(connection) >= version:
+                continue
+            migration(connection)
+            connection.execute(schema_version.update().values(version=version))
+        applied.append(version)
+    return applied
@@ -0,0 +1,151 @@
+import contextlib
+import ipaddress
+import socket
+import aiohttp
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import DefaultResolver
+from yarl import URL
+
+USER_AGENT = "ResearchBot link preview"
+# Redirects are followed one hop at a time so every hop can be checked.
+MAX_REDIRECTS = 10
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class BlockedAddress(aiohttp.ClientConnectionError):
+    """
+    Raised when a link points at an address the bot must not connect to.
+    """
+
+
+def is_public_address(address: str) -> bool:
+    """
+    Return whether ``address`` is a public unicast IP address.
+
+    Loopback, private, link-local, reserved, multicast and unspecified
+    addresses are not public, including IPv4 addresses mapped into IPv6.
+
+    Args:
+        address (str): An IPv4 or IPv6 address.
+
+    Returns:
+        bool: True if the bot may connect to the address.
+    """
+    ip = ipaddress.ip_address(address)
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not (
+        ip.is_private
+        or ip.is_loopback
+        or ip.is_link_local
+        or ip.is_reserved
+        or ip.is_multicast
+        or ip.is_unspecified
+    )
+
+
+def check_url(url: str | URL) -> None:
+    """
+    Refuse a URL whose host is a literal non-public IP address.
+
+    Host names are not resolved here; ``PublicResolver`` checks them when the
+    connection is made, so a name cannot resolve differently in between.
+
+    Raises:
+        BlockedAddress: If the host is an IP address that is not public.
+    """
+    host = URL(url).host
+    try:
+        public = is_public_address(host or "")
+    except ValueError:
+        return
+    if not public:
+        raise BlockedAddress(f"{host} is not a public address")
+
+
+class PublicResolver(AbstractResolver):
+    """
+    Resolves host names like aiohttp's default resolver, but refuses a host
+    if any of its addresses is not public.
+    """
+
+    def __init__(self) -> None:
+        self._resolver = DefaultResolver()
+
+    async def resolve(self, host: str, port: int = 0, family=socket.AF_INET):
+        addresses = await self._resolver.resolve(host, port, family)
+        for address in addresses:
+            if not is_public_address(address["host"]):
+                raise BlockedAddress(f"{host} resolves to {address['host']}")
+        return addresses
+
+    async def close(self) -> None:
+        await self._resolver.close()
+
+
+def client_session(
+    limit: int, limit_per_host: int = 0, timeout: float = 10.0, public_only: bool = True
+) -> aiohttp.ClientSession:
+    """
+    Create the pooled session the link workers fetch user-supplied links with.
+
+    Args:
+        limit (int): The maximum number of open connections.
+        limit_per_host (int): The maximum number of open connections per host,
+            0 for no limit.
+        timeout (float): Seconds a single request may take, body included.
+        public_only (bool): Whether host names must resolve to public addresses.
+
+    Returns:
+        aiohttp.ClientSession: The session.
+    """
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            resolver=PublicResolver() if public_only else None,
+        ),
+        timeout=aiohttp.ClientTimeout(total=timeout),
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+@contextlib.asynccontextmanager
+async def request(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    headers: dict | None = None,
+    public_only: bool = True,
+):
+    """
+    Send a request and follow its redirects, checking the host of every hop.
+
+    Args:
+        session (aiohttp.ClientSession): A session from ``client_session``.
+        method (str): The HTTP method of the first hop.
+        url (str): The URL to request.
+        headers (dict, optional): Headers sent with every hop.
+        public_only (bool): Whether every hop must go to a public address.
+
+    Yields:
+        aiohttp.ClientResponse: The response of the last hop.
+
+    Raises:
+        BlockedAddress: If a hop goes to an address that is not public.
+        aiohttp.TooManyRedirects: If there are more than ``MAX_REDIRECTS`` hops.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        if public_only:
+            check_url(url)
+        async with session.request(
+            method, url, headers=headers, allow_redirects=False
+        ) as response:
+            location = response.headers.get("Location")
+            if response.status not in REDIRECT_STATUSES or location is None:
+                yield response
+                return
+            url = response.url.join(URL(location))
+            if response.status == 303 and method != "HEAD":
+                method = "GET"
+    raise aiohttp.TooManyRedirects(response.request_info, (response,))
@@ -0,0 +1,161 @@
+import discord
+
+# Embeds hold at most 25 fields and 6000 characters, so pages stay well below.
+PAGE_SIZE = 10
+
+
+class KeysetPaginator(discord.ui.View):
+    """
+    Previous/next buttons over pages that are fetched one at a time.
+
+    Pages are read with keyset pagination on the row id: the next page is the
+    ``limit`` rows after the last id shown, the previous page the ``limit`` rows
+    before the first one. Only the current page is ever held in memory.
+
+    When a ``RenderCache`` is given, every page shown is cached under
+    ``(cache_key, page)`` and later views of the same page skip both the query
+    and the rendering until a write bumps the research's version.
+
+    Set ``message`` to the message the view was sent with, so the buttons can
+    be disabled there once the view times out.
+
+    Args:
+        user_id (int): The only user allowed to turn the pages.
+        fetch (Callable): ``await fetch(after=..., before=..., limit=...)``
+            returning rows with an ``id`` attribute, in ascending id order when
+            ``before`` is None and descending order otherwise.
+        render (Callable): ``render(rows, page)`` returning the page embed.
+        page_size (int): Rows per page.
+        cache (RenderCache, optional): Cache for the rendered pages.
+        research_id (int, optional): The research the pages belong to, or None
+            if they span every research.
+        cache_key (tuple, optional): Identifies the listing and its filters.
+    """
+
+    def __init__(
+        self,
+        user_id: int,
+        fetch,
+        render,
+        page_size: int = PAGE_SIZE,
+        cache=None,
+        research_id: int | None = None,
+        cache_key: tuple = (),
+    ):
+        super().__init__(timeout=300)
+        self.user_id = user_id
+        self.fetch = fetch
+        self.render = render
+        self.page_size = page_size
+        self.cache = cache
+        self.research_id = research_id
+        self.cache_key = cache_key
+        self.page = 1
+        self.rows = []
+        self.embed = None
+        self.has_previous = False
+        self.has_next = False
+        self.message: discord.Message | None = None
+
+    async def start(self) -> discord.Embed:
+        """
+        Load the first page.
+
+        Returns:
+            discord.Embed: The embed for the first page.
+        """
+        if self._cached(1):
+            return self._show()
+        version = self._version()
+        rows = await self.fetch(after=None, before=None, limit=self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        self.rows = rows[: self.page_size]
+        return self._render(version)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.user_id
+
+    async def on_timeout(self) -> None:
+        # The view stops listening; leave the page readable, without buttons
+        # that would only fail.
+        for item in self.children:
+            item.disabled = True
+        if self.message is None:
+            return
+        try:
+            await self.message.edit(view=self)
+        except discord.HTTPException:
+            pass
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):
+        if self._cached(self.page - 1):
+            embed = self._show()
+        else:
+            version = self._version()
+            rows = await self.fetch(
+                after=None, before=self.rows[0].id, limit=self.page_size + 1
+            )
+            self.has_previous = len(rows) > self.page_size
+            if rows:
+                self.has_next = True
+                self.rows = rows[: self.page_size][::-1]
+                self.page -= 1
+                embed = self._render(version)
+            else:
+                embed = self._show()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):
+        if self._cached(self.page + 1):
+            embed = self._show()
+        else:
+            version = self._version()
+            rows = await self.fetch(
+                after=self.rows[-1].id, before=None, limit=self.page_size + 1
+            )
+            self.has_next = len(rows) > self.page_size
+            if rows:
+                self.has_previous = True
+                self.rows = rows[: self.page_size]
+                self.page += 1
+                embed = self._render(version)
+            else:
+                embed = self._show()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    def _version(self):
+        if self.cache is None:
+            return None
+        return self.cache.version(self.research_id)
+
+    def _cached(self, page: int) -> bool:
+        if self.cache is None:
+            return False
+        state = self.cache.get(self.research_id, (self.cache_key, page))
+        if state is None:
+            return False
+        self.page = page
+        self.rows, self.has_previous, self.has_next, self.embed = state
+        return True
+
+    def _render(self, version) -> discord.Embed:
+        self.embed = self.render(self.rows, self.page)
+        if self.cache is not None:
+            self.cache.set(
+                self.research_id,
+                (self.cache_key, self.page),
+                (self.rows, self.has_previous, self.has_next, self.embed),
+                version,
+            )
+        return self._show()
+
+    def _show(self) -> discord.Embed:
+        self.previous_page.disabled = not self.has_previous
+        self.next_page.disabled = not self.has_next
+        return self.embed
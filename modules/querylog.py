@@ -0,0 +1,84 @@
+import logging
+import os
+import re
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from modules.metrics import current_invocation
+
+log = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+# Named (psycopg) and positional (sqlite3) parameters, and expanded IN lists.
+_NAMED_PARAMETER = re.compile(r"%\(\w+\)s")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Reduce a statement to its shape, so runs with different values compare equal.
+    """
+    shape = _NAMED_PARAMETER.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    return _PARAMETER_LIST.sub("(?)", shape)
+
+
+class QueryLog:
+    """
+    Logs slow statements and repeated statement shapes per command.
+
+    Statements are charged to the command being handled through
+    ``metrics.current_invocation``; statements run outside a command (startup,
+    reminders) are only checked for slowness.
+
+    Args:
+        slow_ms (float): Statements taking at least this long are logged.
+        repeat_threshold (int): An invocation running the same statement shape
+            more than this many times is reported as a likely N+1 pattern.
+    """
+
+    def __init__(self, slow_ms: float = 100, repeat_threshold: int = 10) -> None:
+        self.slow_seconds = slow_ms / 1000
+        self.repeat_threshold = repeat_threshold
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("querylog_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["querylog_started"].pop()
+        invocation = current_invocation.get()
+        command = f"/{invocation.command}" if invocation is not None else "background"
+        if elapsed >= self.slow_seconds:
+            log.warning(
+                "Slow query (%.1f ms) in %s: %s",
+                elapsed * 1000,
+                command,
+                _WHITESPACE.sub(" ", statement),
+            )
+
+        if invocation is None:
+            return
+        shape = statement_shape(statement)
+        count = invocation.statements.get(shape, 0) + 1
+        invocation.statements[shape] = count
+        # Report once per shape and invocation, when it crosses the threshold.
+        if count == self.repeat_threshold + 1:
+            log.warning(
+                "Possible N+1 in %s: statement ran more than %d times: %s",
+                command,
+                self.repeat_threshold,
+                shape,
+            )
+
+
+def query_log_from_env() -> QueryLog:
+    """
+    Read ``DB_SLOW_QUERY_MS`` and ``DB_REPEAT_THRESHOLD``.
+    """
+    return QueryLog(
+        slow_ms=float(os.environ.get("DB_SLOW_QUERY_MS", "100")),
+        repeat_threshold=int(os.environ.get("DB_REPEAT_THRESHOLD", "10")),
+    )
@@ -0,0 +1,173 @@
+import asyncio
+import datetime
+import heapq
+import itertools
+import logging
+import os
+import discord
+from discord.ext import commands, tasks
+from modules import repository
+from modules.helper import utcnow
+
+log = logging.getLogger(__name__)
+
+
+def lead_times_from_env() -> list[datetime.timedelta]:
+    """
+    Read how long before a deadline reminders are sent.
+
+    ``REMINDER_LEAD_HOURS`` is a comma separated list of hours, e.g. ``"24,1"``.
+    """
+    hours = os.environ.get("REMINDER_LEAD_HOURS", "24,1")
+    return [
+        datetime.timedelta(hours=float(value))
+        for value in hours.split(",")
+        if value.strip()
+    ]
+
+
+class ReminderScheduler:
+    """
+    Sends researchers a DM ahead of their demand deadlines.
+
+    Upcoming reminders live in a min-heap ordered by send time, loaded from the
+    database once. The loop sleeps until the earliest one is due instead of
+    polling the table. Changing a deadline pushes new entries in O(log n). Every
+    ``schedule`` and ``cancel`` gives the demand a new generation, and entries
+    from older generations are skipped when they surface, so rescheduling the
+    same deadline never sends a reminder twice. A demand's generation is
+    dropped once its last reminder is sent.
+
+    Args:
+        bot (commands.Bot): The bot used to look up and message researchers.
+        lead_times (list[datetime.timedelta]): How long before each deadline to
+            send a reminder.
+    """
+
+    def __init__(self, bot: commands.Bot, lead_times: list[datetime.timedelta]):
+        self.bot = bot
+        self.lead_times = lead_times
+        # (send at, demand id, generation, whether it is the demand's last)
+        self._heap: list[tuple[datetime.datetime, int, int, bool]] = []
+        # demand id -> generation of its live heap entries
+        self._generations: dict[int, int] = {}
+        self._counter = itertools.count()
+        self._wake = asyncio.Event()
+
+    async def load(self, db) -> None:
+        """
+        Fill the heap with every unfinished demand that has a future deadline.
+
+        Args:
+            db (BotDb): The bot database.
+        """
+        now = utcnow()
+        for demand_id, deadline in await db.run(repository.pending_deadlines, now):
+            generation = next(self._counter)
+            entries = self._entries(demand_id, deadline, generation, now)
+            if entries:
+                self._generations[demand_id] = generation
+                self._heap.extend(entries)
+        heapq.heapify(self._heap)
+
+    def start(self) -> None:
+        self.send_due.start()
+
+    def stop(self) -> None:
+        self.send_due.cancel()
+
+    def schedule(self, demand_id: int, deadline: datetime.datetime | None) -> None:
+        """
+        Set or replace the reminders of a demand; a None deadline cancels them.
+        """
+        generation = next(self._counter)
+        entries = (
+            self._entries(demand_id, deadline, generation, utcnow())
+            if deadline is not None
+            else []
+        )
+        if not entries:
+            self.cancel(demand_id)
+            return
+        self._generations[demand_id] = generation
+        for entry in entries:
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._wake.set()
+        self._compact()
+
+    def cancel(self, demand_id: int) -> None:
+        """
+        Drop the pending reminders of a demand, e.g. when it is done.
+        """
+        self._generations.pop(demand_id, None)
+        self._compact()
+
+    def _entries(self, demand_id, deadline, generation, now):
+        send_times = sorted(
+            deadline - lead for lead in self.lead_times if deadline - lead > now
+        )
+        return [
+            (send_at, demand_id, generation, send_at == send_times[-1])
+            for send_at in send_times
+        ]
+
+    def _compact(self) -> None:
+        # Replaced entries are removed lazily; rebuild once they dominate.
+        if len(self._heap) > 2 * len(self.lead_times) * (len(self._generations) + 1):
+            self._heap = [
+                entry
+                for entry in self._heap
+                if self._generations.get(entry[1]) == entry[2]
+            ]
+            heapq.heapify(self._heap)
+
+    @tasks.loop()
+    async def send_due(self):
+        self._wake.clear()
+        now = utcnow()
+        while self._heap and self._heap[0][0] <= now:
+            _send_at, demand_id, generation, last = heapq.heappop(self._heap)
+            if self._generations.get(demand_id) != generation:
+                continue
+            if last:
+                del self._generations[demand_id]
+            try:
+                await self._remind(demand_id)
+            except Exception:
+                log.exception("Failed to send the reminder for demand %s", demand_id)
+
+        timeout = (self._heap[0][0] - now).total_seconds() if self._heap else None
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    @send_due.before_loop
+    async def before_send_due(self):
+        await self.bot.wait_until_ready()
+
+    async def _remind(self, demand_id: int) -> None:
+        details = await self.bot.db.run(repository.reminder_details, demand_id)
+        if details is None or details.done or details.deadline is None:
+            return
+        user = discord.utils.get(self.bot.users, name=details.researcher)
+        if user is None:
+            return
+
+        embed = discord.Embed(
+            title="⏰ تذكير بموعد التسليم",
+            description=(
+                f"📌 **المطلب:**\n➥ {details.demand}\n\n"
+                f"📚 **البحث:**\n➥ {details.research}\n\n"
+                f"🗓️ **موعد التسليم:**\n"
+                f"➥ {details.deadline.strftime('%Y-%m-%d %H:%M')}"
+            ),
+            color=discord.Color.gold(),
+            timestamp=discord.utils.utcnow(),
+        )
+        embed.set_footer(text="نظام إدارة الأبحاث")
+        try:
+            await user.send(embed=embed)
+        except discord.HTTPException:
+            log.warning("Could not send a deadline reminder to %s", user)
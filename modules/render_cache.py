@@ -0,0 +1,85 @@
+from collections import OrderedDict
+
+import discord
+
+
+class RenderCache:
+    """
+    Rendered ``show_demands``/``show_resources`` pages, invalidated per research.
+
+    Every entry is stored with the version of its research at the time its rows
+    were read. Writes call ``bump`` for the research they touched, so every
+    cached page of that research misses from then on without scanning the
+    cache. Pages that span every research are filed under ``None`` and are
+    invalidated by any bump.
+
+    Only the event loop touches the cache, so it needs no locking.
+
+    Args:
+        maxsize (int): The number of entries kept before evicting the least
+            recently used one.
+    """
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self._epoch = 0
+        self._versions: dict[int | None, int] = {}
+        self._entries: OrderedDict = OrderedDict()
+
+    def version(self, research_id: int | None) -> tuple[int, int]:
+        """
+        Return the current version of a research, to pass to ``set`` later.
+        """
+        return self._epoch, self._versions.get(research_id, 0)
+
+    def bump(self, research_id: int | None = None) -> None:
+        """
+        Invalidate the pages of one research, or of every research for None.
+        """
+        if research_id is None:
+            self._epoch += 1
+        else:
+            self._versions[research_id] = self._versions.get(research_id, 0) + 1
+        self._versions[None] = self._versions.get(None, 0) + 1
+
+    def get(self, research_id: int | None, key):
+        """
+        Return the cached value, or None if it is missing or out of date.
+        """
+        entry = self._entries.get((research_id, key))
+        if entry is None:
+            return None
+        version, value = entry
+        if version != self.version(research_id):
+            del self._entries[(research_id, key)]
+            return None
+        self._entries.move_to_end((research_id, key))
+        return value
+
+    def set(self, research_id: int | None, key, value, version: tuple[int, int]):
+        """
+        Cache ``value`` as of ``version``, taken before its rows were read.
+        """
+        if version != self.version(research_id):
+            return
+        self._entries[(research_id, key)] = (version, value)
+        self._entries.move_to_end((research_id, key))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def invalidate(
+    client: discord.Client, guild_id: int, research: str | None = None
+) -> None:
+    """
+    Invalidate the cached pages of a research after a write.
+
+    Args:
+        client (discord.Client): The bot.
+        guild_id (int): The guild owning the research.
+        research (str, optional): The research name, or None after a write
+            that may touch any research.
+    """
+    research_ids = client.autocomplete.guild(guild_id).research_ids
+    research_id = research_ids.get(research) if research else None
+    client.render_cache.bump(research_id)
@@ -0,0 +1,1236 @@
+import datetime
+
+from sqlalchemy import (
+    String,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from modules.db import UNASSIGNED, UNSCOPED_GUILD, Dbstruct, utcnow
+
+
+class ResearchNotFound(Exception):
+    """
+    Raised when no research matches the requested name.
+    """
+
+
+class ResearchExists(Exception):
+    """
+    Raised when adding a research whose name is already taken.
+    """
+
+
+class DemandNotFound(Exception):
+    """
+    Raised when the research exists but has no demand with the requested name.
+    """
+
+
+def _resolver(session: Session):
+    return session.info.get("resolver")
+
+
+def _assigned(researcher: str | None) -> bool:
+    return researcher is not None and researcher != UNASSIGNED
+
+
+def _count_changes(session: Session, research_id: int, **deltas: int) -> None:
+    """
+    Add ``deltas`` to the ``research_counters`` row of a research.
+
+    Every function that adds, removes or changes the state of demands or
+    resources calls this in the same transaction, so the counters never
+    drift from the rows they count.
+    """
+    counters = Dbstruct.research_counters
+    values = {
+        name: getattr(counters, name) + int(delta)
+        for name, delta in deltas.items()
+        if delta
+    }
+    if values:
+        session.execute(
+            update(counters)
+            .where(counters.research_id == research_id)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _research_id(session: Session, guild_id: int, research: str) -> int:
+    """
+    Resolve a research name inside a guild, from the shared cache when possible.
+
+    Raises:
+        ResearchNotFound: If the guild has no research with this name.
+    """
+    resolver = _resolver(session)
+    research_id = resolver.research.get((guild_id, research)) if resolver else None
+    if research_id is None:
+        research_id = session.scalar(
+            select(Dbstruct.research.id).where(
+                Dbstruct.research.guild_id == guild_id,
+                Dbstruct.research.name == research,
+            )
+        )
+        if research_id is None:
+            raise ResearchNotFound(research)
+        if resolver:
+            resolver.research.set((guild_id, research), research_id)
+    return research_id
+
+
+def resolve_demand(
+    session: Session, guild_id: int, research: str, demand: str, *columns
+):
+    """
+    Resolve a research and one of its demands in a single JOINed statement.
+
+    Args:
+        guild_id (int): The guild owning the research.
+        research (str): The research name.
+        demand (str): The demand name.
+        *columns: Extra ``demands`` columns to load with the ids.
+
+    Returns:
+        Row: ``(research_id, demand_id, *columns)``.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+        DemandNotFound: If the demand does not exist in the research.
+    """
+    research_table = Dbstruct.research
+    demands = Dbstruct.demands
+    row = session.execute(
+        select(research_table.id, demands.id, *columns)
+        .outerjoin(
+            demands,
+            (demands.research_id == research_table.id) & (demands.demand == demand),
+        )
+        .where(research_table.guild_id == guild_id, research_table.name == research)
+        .limit(1)
+    ).first()
+    if row is None:
+        raise ResearchNotFound(research)
+    resolver = _resolver(session)
+    if resolver:
+        resolver.research.set((guild_id, research), row[0])
+    if row[1] is None:
+        raise DemandNotFound(demand)
+    if resolver:
+        resolver.demands.set((guild_id, research, demand), (row[1], row[0]))
+    return row
+
+
+def _demand_id(
+    session: Session, guild_id: int, research: str | None, demand: str
+) -> tuple[int, int]:
+    """
+    Resolve a demand name inside a research, from the shared cache when possible.
+
+    Args:
+        guild_id (int): The guild owning the research.
+        research (str, optional): The research name, or None for the first
+            demand with this name in any research of the guild.
+
+    Returns:
+        tuple[int, int]: The demand id and its research id.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+        DemandNotFound: If the demand does not exist in the research.
+    """
+    resolver = _resolver(session)
+    ids = resolver.demands.get((guild_id, research, demand)) if resolver else None
+    if ids is not None:
+        return ids
+    if research is not None:
+        research_id, demand_id = resolve_demand(session, guild_id, research, demand)
+        return demand_id, research_id
+
+    demands = Dbstruct.demands
+    ids = session.execute(
+        select(demands.id, demands.research_id)
+        .where(demands.guild_id == guild_id, demands.demand == demand)
+        .limit(1)
+    ).first()
+    if ids is None:
+        raise DemandNotFound(demand)
+    ids = tuple(ids)
+    if resolver:
+        resolver.demands.set((guild_id, None, demand), ids)
+    return ids
+
+
+def _update_demand(
+    session: Session,
+    guild_id: int,
+    research: str,
+    demand: str,
+    demand_id: int,
+    **values,
+):
+    demands = Dbstruct.demands
+    result = session.execute(
+        update(demands)
+        .where(demands.id == demand_id)
+        .values(**values)
+        .returning(demands.deadline)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if result is None:
+        # The cached id points at a row that no longer exists.
+        resolver = _resolver(session)
+        if resolver:
+            resolver.forget(guild_id, research, demand)
+        raise DemandNotFound(demand)
+    return result
+
+
+def research_names(session: Session) -> list[tuple[int, int, str]]:
+    research = Dbstruct.research
+    return [
+        tuple(row)
+        for row in session.execute(
+            select(research.guild_id, research.id, research.name)
+        )
+    ]
+
+
+def demand_names(session: Session) -> list[tuple[int, str]]:
+    demands = Dbstruct.demands
+    return [
+        tuple(row) for row in session.execute(select(demands.guild_id, demands.demand))
+    ]
+
+
+def research_demand_names(
+    session: Session, research_id: int, current: str, limit: int
+) -> list[str]:
+    """
+    Return up to ``limit`` demand names of one research containing ``current``.
+
+    Walks the ``(research_id, demand)`` index, so the cost depends on the size of
+    the research rather than on the whole demands table.
+    """
+    demands = Dbstruct.demands
+    query = select(demands.demand).where(demands.research_id == research_id)
+    if current:
+        query = query.where(demands.demand.icontains(current, autoescape=True))
+    return list(session.scalars(query.distinct().order_by(demands.demand).limit(limit)))
+
+
+def resource_names(session: Session) -> list[tuple[int, int, str]]:
+    resources = Dbstruct.resources
+    return [
+        tuple(row)
+        for row in session.execute(
+            select(resources.guild_id, resources.id, resources.resource_name)
+        )
+    ]
+
+
+def claim_unscoped_rows(session: Session, guild_id: int) -> int:
+    """
+    Move every row created before guilds were tracked into ``guild_id``.
+
+    Research whose name is already taken in ``guild_id`` is renamed to
+    ``"<name> (<id>)"``, as migration 1 did for duplicate names.
+
+    Returns:
+        int: The number of research moved.
+    """
+    research = Dbstruct.research
+    taken = select(research.name).where(research.guild_id == guild_id)
+    session.execute(
+        update(research)
+        .where(research.guild_id == UNSCOPED_GUILD, research.name.in_(taken))
+        .values(name=research.name + " (" + cast(research.id, String) + ")")
+        .execution_options(synchronize_session=False)
+    )
+    for table in (Dbstruct.demands, Dbstruct.resources):
+        session.execute(
+            update(table)
+            .where(table.guild_id == UNSCOPED_GUILD)
+            .values(guild_id=guild_id)
+            .execution_options(synchronize_session=False)
+        )
+    return session.execute(
+        update(research)
+        .where(research.guild_id == UNSCOPED_GUILD)
+        .values(guild_id=guild_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def add_research(session: Session, guild_id: int, name: str) -> int:
+    """
+    Returns:
+        int: The id of the new research.
+
+    Raises:
+        ResearchExists: If the guild already has a research with this name.
+    """
+    research = Dbstruct.research(guild_id=guild_id, name=name)
+    session.add(research)
+    try:
+        session.flush()
+    except IntegrityError as error:
+        raise ResearchExists(name) from error
+    session.add(Dbstruct.research_counters(research_id=research.id))
+    return research.id
+
+
+def add_demand(
+    session: Session,
+    guild_id: int,
+    research: str,
+    demand: str,
+    added_by: str,
+    researcher: str,
+    deadline: datetime.datetime | None,
+) -> int:
+    """
+    Add a demand to an existing research.
+
+    Returns:
+        int: The id of the new demand.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+    """
+    demand_entry = Dbstruct.demands(
+        demand=demand,
+        added_by=added_by,
+        researcher=researcher,
+        research_id=_research_id(session, guild_id, research),
+        guild_id=guild_id,
+        deadline=deadline,
+    )
+    session.add(demand_entry)
+    session.flush()
+    _count_changes(
+        session,
+        demand_entry.research_id,
+        demands=1,
+        assigned=_assigned(researcher),
+    )
+    return demand_entry.id
+
+
+def assign_researcher(
+    session: Session, guild_id: int, research: str, demand: str, researcher: str
+) -> None:
+    """
+    Raises:
+        ResearchNotFound: If the research does not exist.
+        DemandNotFound: If the demand does not exist in the research.
+    """
+    research_id, demand_id, old_researcher = resolve_demand(
+        session, guild_id, research, demand, Dbstruct.demands.researcher
+    )
+    _update_demand(
+        session, guild_id, research, demand, demand_id, researcher=researcher
+    )
+    _count_changes(
+        session,
+        research_id,
+        assigned=_assigned(researcher) - _assigned(old_researcher),
+    )
+
+
+def set_deadline(
+    session: Session,
+    guild_id: int,
+    research: str,
+    demand: str,
+    deadline: datetime.datetime,
+) -> tuple[int, datetime.datetime | None]:
+    """
+    Replace the deadline of a demand.
+
+    Returns:
+        tuple[int, datetime.datetime | None]: The demand id and its previous
+        deadline.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+        DemandNotFound: If the demand does not exist in the research.
+    """
+    _research, demand_id, old_deadline = resolve_demand(
+        session, guild_id, research, demand, Dbstruct.demands.deadline
+    )
+    _update_demand(session, guild_id, research, demand, demand_id, deadline=deadline)
+    return demand_id, old_deadline
+
+
+def remove_researcher(
+    session: Session, guild_id: int, research: str, demand: str
+) -> str | None:
+    """
+    Unassign the researcher of a demand.
+
+    Returns:
+        str | None: The removed researcher, or None if nobody was assigned.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+        DemandNotFound: If the demand does not exist in the research.
+    """
+    research_id, demand_id, old_researcher = resolve_demand(
+        session, guild_id, research, demand, Dbstruct.demands.researcher
+    )
+    if old_researcher is not None:
+        _update_demand(session, guild_id, research, demand, demand_id, researcher=None)
+        _count_changes(session, research_id, assigned=-_assigned(old_researcher))
+    return old_researcher
+
+
+def set_demand_done(
+    session: Session, guild_id: int, research: str, demand: str, done: bool
+) -> tuple[int, datetime.datetime | None]:
+    """
+    Returns:
+        tuple[int, datetime.datetime | None]: The demand id and its deadline.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+        DemandNotFound: If the demand does not exist in the research.
+    """
+    research_id, demand_id, was_done = resolve_demand(
+        session, guild_id, research, demand, Dbstruct.demands.done
+    )
+    (deadline,) = _update_demand(
+        session, guild_id, research, demand, demand_id, done=done
+    )
+    _count_changes(session, research_id, done=bool(done) - bool(was_done))
+    return demand_id, deadline
+
+
+def pending_deadlines(session: Session, after: datetime.datetime) -> list:
+    """
+    Return ``(id, deadline)`` of every unfinished demand due after ``after``.
+    """
+    demands = Dbstruct.demands
+    return session.execute(
+        select(demands.id, demands.deadline).where(
+            demands.deadline > after, demands.done.is_not(True)
+        )
+    ).all()
+
+
+def reminder_details(session: Session, demand_id: int):
+    """
+    Return the current state of a demand for a deadline reminder, or None if the
+    demand no longer exists.
+    """
+    demands = Dbstruct.demands
+    return session.execute(
+        select(
+            demands.demand,
+            demands.researcher,
+            demands.deadline,
+            demands.done,
+            Dbstruct.research.name.label("research"),
+        )
+        .join(Dbstruct.research, Dbstruct.research.id == demands.research_id)
+        .where(demands.id == demand_id)
+    ).first()
+
+
+# Rows fetched per round trip when streaming large result sets.
+STREAM_BATCH = 1000
+
+# Keeps IN lists well below SQLite's bound parameter limit.
+IN_BATCH = 500
+
+
+def _batches(values: list, size: int = IN_BATCH):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def research_ids(session: Session, guild_id: int, names: set[str]) -> dict[str, int]:
+    """
+    Resolve many research names of a guild at once.
+
+    Returns:
+        dict[str, int]: Research ids by name; unknown names are left out.
+    """
+    research = Dbstruct.research
+    found = {}
+    for batch in _batches(sorted(names)):
+        found.update(
+            session.execute(
+                select(research.name, research.id).where(
+                    research.guild_id == guild_id, research.name.in_(batch)
+                )
+            ).all()
+        )
+    return found
+
+
+def demand_ids(session: Session, pairs: set[tuple[int, str]]) -> dict:
+    """
+    Resolve many ``(research_id, demand name)`` pairs at once.
+
+    Returns:
+        dict[tuple[int, str], int]: Demand ids by pair; unknown pairs are left out.
+    """
+    demands = Dbstruct.demands
+    found = {}
+    for batch in _batches(sorted(pairs)):
+        rows = session.execute(
+            select(demands.research_id, demands.demand, demands.id).where(
+                demands.research_id.in_({research_id for research_id, _ in batch}),
+                demands.demand.in_({demand for _, demand in batch}),
+            )
+        )
+        found.update(
+            ((research_id, demand), demand_id)
+            for research_id, demand, demand_id in rows
+            if (research_id, demand) in pairs
+        )
+    return found
+
+
+def bulk_add_demands(session: Session, rows: list[dict]) -> list:
+    """
+    Insert many demands with one executemany.
+
+    Every row must carry the ``guild_id`` of its research.
+
+    Returns:
+        list: ``(id, demand, deadline)`` of the inserted rows, in input order.
+    """
+    if not rows:
+        return []
+    demands = Dbstruct.demands
+    inserted = session.execute(
+        insert(demands).returning(
+            demands.id, demands.demand, demands.deadline, sort_by_parameter_order=True
+        ),
+        rows,
+    ).all()
+    totals = {}
+    for row in rows:
+        added, assigned = totals.get(row["research_id"], (0, 0))
+        totals[row["research_id"]] = (
+            added + 1,
+            assigned + _assigned(row.get("researcher")),
+        )
+    for research_id, (added, assigned) in totals.items():
+        _count_changes(session, research_id, demands=added, assigned=assigned)
+    return inserted
+
+
+def bulk_add_resources(session: Session, rows: list[dict]) -> list:
+    """
+    Insert many resources with one executemany.
+
+    Every row must carry the ``guild_id`` of its research.
+
+    Returns:
+        list: ``(id, resource_name, resource_link)`` of the inserted rows, in
+        input order.
+    """
+    if not rows:
+        return []
+    resources = Dbstruct.resources
+    inserted = session.execute(
+        insert(resources).returning(
+            resources.id,
+            resources.resource_name,
+            resources.resource_link,
+            sort_by_parameter_order=True,
+        ),
+        rows,
+    ).all()
+    totals = {}
+    for row in rows:
+        totals[row["research_id"]] = totals.get(row["research_id"], 0) + 1
+    for research_id, added in totals.items():
+        _count_changes(session, research_id, resources=added)
+    return inserted
+
+
+def stream_demands(session: Session, guild_id: int, research: str):
+    """
+    Return the demands of a research as a result that fetches rows in batches.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+    """
+    research_id = _research_id(session, guild_id, research)
+    demands = Dbstruct.demands
+    query = (
+        select(
+            demands.demand,
+            demands.added_by,
+            demands.researcher,
+            demands.deadline,
+            demands.done,
+        )
+        .where(demands.research_id == research_id)
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+    return session.execute(query)
+
+
+def _keyset(query, column, after: int | None, before: int | None, limit: int):
+    if before is not None:
+        return query.where(column < before).order_by(column.desc()).limit(limit)
+    if after is not None:
+        query = query.where(column > after)
+    return query.order_by(column).limit(limit)
+
+
+def count_demands(session: Session, guild_id: int, research: str) -> int:
+    """
+    Raises:
+        ResearchNotFound: If the research does not exist.
+    """
+    research_id = _research_id(session, guild_id, research)
+    return session.scalar(
+        select(func.count()).where(Dbstruct.demands.research_id == research_id)
+    )
+
+
+def demand_page(
+    session: Session,
+    guild_id: int,
+    research: str,
+    after: int | None = None,
+    before: int | None = None,
+    limit: int = 10,
+) -> list:
+    """
+    Return one page of a research's demands, keyed on the demand id.
+
+    Args:
+        after (int, optional): Return the rows following this id, ascending.
+        before (int, optional): Return the rows preceding this id, descending.
+        limit (int): The page size.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+    """
+    research_id = _research_id(session, guild_id, research)
+    demands = Dbstruct.demands
+    query = select(
+        demands.id,
+        demands.demand,
+        demands.added_by,
+        demands.researcher,
+        demands.deadline,
+        demands.done,
+    ).where(demands.research_id == research_id)
+    return session.execute(_keyset(query, demands.id, after, before, limit)).all()
+
+
+def add_resource(
+    session: Session,
+    guild_id: int,
+    title: str,
+    research: str,
+    demand: str,
+    link: str,
+    added_by: str,
+) -> tuple[int, str]:
+    """
+    Add a resource to a demand.
+
+    Returns:
+        tuple[int, str]: The new resource id and its stored name.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+        DemandNotFound: If the demand does not exist in the research.
+    """
+    demand_id, research_id = _demand_id(session, guild_id, research, demand)
+    resource = Dbstruct.resources(
+        resource_name=f"{title} - {demand} ",
+        resource_link=link,
+        research_id=research_id,
+        guild_id=guild_id,
+        demand_id=demand_id,
+        added_by=added_by,
+    )
+    session.add(resource)
+    session.flush()
+    _count_changes(session, research_id, resources=1)
+    return resource.id, resource.resource_name
+
+
+def set_resource_metadata(
+    session: Session,
+    resource_id: int,
+    title: str | None,
+    content_type: str | None,
+    size: int | None,
+) -> int | None:
+    """
+    Store the fetched metadata of a resource's link.
+
+    Returns:
+        int | None: The research id of the resource, or None if it was deleted
+            in the meantime.
+    """
+    resources = Dbstruct.resources
+    return session.scalar(
+        update(resources)
+        .where(resources.id == resource_id)
+        .values(
+            link_title=title,
+            content_type=content_type,
+            content_length=size,
+            enriched_at=utcnow(),
+        )
+        .returning(resources.research_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def links_to_check(
+    session: Session, checked_before: datetime.datetime, limit: int
+) -> list:
+    """
+    Return the resources of every guild whose link is due for a health check.
+
+    Links that were never checked come first, then the least recently checked.
+
+    Args:
+        checked_before (datetime.datetime): Links checked since are skipped.
+        limit (int): The maximum number of rows returned.
+
+    Returns:
+        list: Rows of ``(id, research_id, resource_link, link_etag,
+        link_last_modified, link_failures)``.
+    """
+    resources = Dbstruct.resources
+    return session.execute(
+        select(
+            resources.id,
+            resources.research_id,
+            resources.resource_link,
+            resources.link_etag,
+            resources.link_last_modified,
+            resources.link_failures,
+        )
+        .where(
+            or_(
+                resources.link_checked_at.is_(None),
+                resources.link_checked_at < checked_before,
+            )
+        )
+        .order_by(resources.link_checked_at.nulls_first(), resources.id)
+        .limit(limit)
+    ).all()
+
+
+def record_link_checks(
+    session: Session, checks: list[dict], checked_at: datetime.datetime
+) -> None:
+    """
+    Store the outcome of a batch of link checks with one executemany.
+
+    Args:
+        checks (list[dict]): Per resource, its ``resource_id`` and the new
+            ``link_status``, ``link_latency_ms``, ``link_etag``,
+            ``link_last_modified`` and ``link_failures``.
+        checked_at (datetime.datetime): When the checking round started.
+    """
+    if not checks:
+        return
+    table = Dbstruct.resources.__table__
+    session.execute(
+        update(table).where(table.c.id == bindparam("resource_id"))
+        # The other keys of each check become the SET clause.
+        .values(link_checked_at=checked_at),
+        checks,
+    )
+
+
+def dead_links(
+    session: Session, guild_id: int, research: str | None = None, limit: int = 25
+) -> list:
+    """
+    Return the resources of a guild whose link failed its latest check.
+
+    Args:
+        guild_id (int): The guild owning the resources.
+        research (str, optional): Only report this research.
+        limit (int): The maximum number of rows returned.
+
+    Returns:
+        list: Rows of ``(id, resource_name, resource_link, link_status,
+        link_failures, link_checked_at)``, most consecutive failures first.
+
+    Raises:
+        ResearchNotFound: If ``research`` is given but does not exist.
+    """
+    resources = Dbstruct.resources
+    query = select(
+        resources.id,
+        resources.resource_name,
+        resources.resource_link,
+        resources.link_status,
+        resources.link_failures,
+        resources.link_checked_at,
+    ).where(resources.guild_id == guild_id, resources.link_failures > 0)
+    if research:
+        query = query.where(
+            resources.research_id == _research_id(session, guild_id, research)
+        )
+    return session.execute(
+        query.order_by(resources.link_failures.desc(), resources.id).limit(limit)
+    ).all()
+
+
+def delete_resource(session: Session, guild_id: int, resource_id: int) -> int | None:
+    """
+    Returns:
+        int | None: The research id of the deleted resource, or None if the
+            guild has no resource with this id.
+    """
+    resources = Dbstruct.resources
+    deleted = session.execute(
+        delete(resources)
+        .where(resources.guild_id == guild_id, resources.id == resource_id)
+        .returning(resources.research_id, resources.is_read)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if deleted is None:
+        return None
+    _count_changes(
+        session,
+        deleted.research_id,
+        resources=-1,
+        read_resources=-bool(deleted.is_read),
+    )
+    return deleted.research_id
+
+
+def _resource_filters(
+    session: Session, guild_id: int, research: str | None, demand: str | None
+) -> list:
+    # Unknown research or demand names are ignored, matching the filters
+    # being optional. Research and demands are resolved within the guild, so
+    # the guild only needs filtering when neither applies; adding it anyway
+    # leads SQLite to scan the whole guild on ix_resources_guild_id.
+    # A demand name is looked up inside the research when one is found, since
+    # several researches may share it.
+    resources = Dbstruct.resources
+    filters = []
+    found = None
+    if research:
+        try:
+            research_id = _research_id(session, guild_id, research)
+            filters.append(resources.research_id == research_id)
+            found = research
+        except ResearchNotFound:
+            pass
+
+    if demand:
+        try:
+            demand_id, _research = _demand_id(session, guild_id, found, demand)
+            filters.append(resources.demand_id == demand_id)
+        except DemandNotFound:
+            pass
+    return filters or [resources.guild_id == guild_id]
+
+
+def stream_resources(
+    session: Session,
+    guild_id: int,
+    research: str | None = None,
+    demand: str | None = None,
+):
+    """
+    Return a guild's resources as a result that fetches rows in batches,
+    optionally filtered by research and demand.
+    """
+    resources = Dbstruct.resources
+    query = (
+        select(
+            resources.resource_name,
+            resources.resource_link,
+            resources.added_by,
+            resources.is_read,
+            resources.added_at,
+        )
+        .where(*_resource_filters(session, guild_id, research, demand))
+        .execution_options(yield_per=STREAM_BATCH)
+    )
+    return session.execute(query)
+
+
+def count_resources(
+    session: Session,
+    guild_id: int,
+    research: str | None = None,
+    demand: str | None = None,
+) -> int:
+    return session.scalar(
+        select(func.count(Dbstruct.resources.id)).where(
+            *_resource_filters(session, guild_id, research, demand)
+        )
+    )
+
+
+def resource_page(
+    session: Session,
+    guild_id: int,
+    research: str | None = None,
+    demand: str | None = None,
+    after: int | None = None,
+    before: int | None = None,
+    limit: int = 10,
+) -> list:
+    """
+    Return one page of a guild's resources, keyed on the resource id.
+
+    See ``demand_page`` for the meaning of ``after``, ``before`` and ``limit``.
+    """
+    resources = Dbstruct.resources
+    query = select(
+        resources.id,
+        resources.resource_name,
+        resources.resource_link,
+        resources.added_by,
+        resources.is_read,
+        resources.link_title,
+        resources.content_type,
+        resources.content_length,
+        resources.link_status,
+        resources.link_failures,
+    ).where(*_resource_filters(session, guild_id, research, demand))
+    return session.execute(_keyset(query, resources.id, after, before, limit)).all()
+
+
+def mark_resource_read(
+    session: Session, guild_id: int, resource_id: int, read_by: str
+) -> int | None:
+    """
+    Returns:
+        int | None: The research id of the resource, or None if the guild has
+            no resource with this id.
+    """
+    resources = Dbstruct.resources
+    current = session.execute(
+        select(resources.research_id, resources.is_read).where(
+            resources.guild_id == guild_id, resources.id == resource_id
+        )
+    ).first()
+    if current is None:
+        return None
+    session.execute(
+        update(resources)
+        .where(resources.id == resource_id)
+        .values(is_read=True, read_by=read_by)
+        .execution_options(synchronize_session=False)
+    )
+    _count_changes(session, current.research_id, read_resources=not current.is_read)
+    return current.research_id
+
+
+def _demand_filters(
+    research_id: int, researcher: str | None, names: list[str] | None
+) -> list:
+    demands = Dbstruct.demands
+    filters = [demands.research_id == research_id]
+    if researcher:
+        filters.append(demands.researcher == researcher)
+    if names:
+        filters.append(demands.demand.in_(names))
+    return filters
+
+
+def bulk_set_demands_done(
+    session: Session,
+    guild_id: int,
+    research: str,
+    done: bool,
+    researcher: str | None = None,
+    names: list[str] | None = None,
+) -> list:
+    """
+    Mark every matching demand of a research as done or not done with one UPDATE.
+
+    Args:
+        guild_id (int): The guild owning the research.
+        research (str): The research name.
+        done (bool): The new state.
+        researcher (str, optional): Only change this researcher's demands.
+        names (list[str], optional): Only change demands with these names.
+
+    Returns:
+        list: ``(id, deadline)`` of every demand that changed state.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+    """
+    research_id = _research_id(session, guild_id, research)
+    demands = Dbstruct.demands
+    current = demands.done.is_(True) if not done else demands.done.is_not(True)
+    changed = session.execute(
+        update(demands)
+        .where(*_demand_filters(research_id, researcher, names), current)
+        .values(done=done)
+        .returning(demands.id, demands.deadline)
+        .execution_options(synchronize_session=False)
+    ).all()
+    _count_changes(session, research_id, done=len(changed) if done else -len(changed))
+    return changed
+
+
+def bulk_remove_researcher(
+    session: Session,
+    guild_id: int,
+    research: str,
+    researcher: str | None = None,
+    names: list[str] | None = None,
+) -> int:
+    """
+    Unassign every matching demand of a research with one UPDATE.
+
+    See ``bulk_set_demands_done`` for the filters.
+
+    Returns:
+        int: The number of demands that lost their researcher.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+    """
+    research_id = _research_id(session, guild_id, research)
+    demands = Dbstruct.demands
+    # Demands holding the UNASSIGNED placeholder have no researcher to lose.
+    removed = session.execute(
+        update(demands)
+        .where(
+            *_demand_filters(research_id, researcher, names),
+            demands.researcher.is_not(None),
+            demands.researcher != UNASSIGNED,
+        )
+        .values(researcher=None)
+        .returning(demands.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    _count_changes(session, research_id, assigned=-len(removed))
+    return len(removed)
+
+
+def bulk_mark_resources_read(
+    session: Session,
+    guild_id: int,
+    research: str,
+    read_by: str,
+    demand: str | None = None,
+    ids: list[int] | None = None,
+) -> int:
+    """
+    Mark every matching unread resource of a research as read with one UPDATE.
+
+    Args:
+        guild_id (int): The guild owning the research.
+        research (str): The research name.
+        read_by (str): The user marking the resources.
+        demand (str, optional): Only change resources of this demand.
+        ids (list[int], optional): Only change resources with these ids.
+
+    Returns:
+        int: The number of resources that were marked read.
+
+    Raises:
+        ResearchNotFound: If the research does not exist.
+    """
+    research_id = _research_id(session, guild_id, research)
+    resources = Dbstruct.resources
+    filters = [resources.research_id == research_id, resources.is_read.is_not(True)]
+    if demand:
+        filters.append(
+            resources.demand_id.in_(
+                select(Dbstruct.demands.id).where(
+                    Dbstruct.demands.research_id == research_id,
+                    Dbstruct.demands.demand == demand,
+                )
+            )
+        )
+    if ids:
+        filters.append(resources.id.in_(ids))
+    marked = session.execute(
+        update(resources)
+        .where(*filters)
+        .values(is_read=True, read_by=read_by)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    _count_changes(session, research_id, read_resources=marked)
+    return marked
+
+
+def research_status(
+    session: Session,
+    guild_id: int,
+    now: datetime.datetime,
+    research: str | None = None,
+) -> list:
+    """
+    Return the progress of every research of a guild, or of one research.
+
+    Everything but the overdue count comes from ``research_counters``; overdue
+    demands are counted over ``ix_demands_open_deadline``, which only holds
+    unfinished demands, so no call scans or aggregates a whole research.
+
+    Args:
+        guild_id (int): The guild owning the research.
+        now (datetime.datetime): Demands due before this are overdue.
+        research (str, optional): Only report this research.
+
+    Returns:
+        list: Rows of ``(name, demands, assigned, done, overdue, resources,
+        read_resources)`` ordered by name.
+
+    Raises:
+        ResearchNotFound: If ``research`` is given but does not exist.
+    """
+    research_table = Dbstruct.research
+    counters = Dbstruct.research_counters
+    demands = Dbstruct.demands
+    overdue = (
+        select(func.count(demands.id))
+        .where(
+            demands.research_id == research_table.id,
+            demands.done.is_not(True),
+            demands.deadline < now,
+        )
+        .scalar_subquery()
+    )
+    query = (
+        select(
+            research_table.name,
+            counters.demands,
+            counters.assigned,
+            counters.done,
+            overdue.label("overdue"),
+            counters.resources,
+            counters.read_resources,
+        )
+        .join(counters, counters.research_id == research_table.id)
+        .where(research_table.guild_id == guild_id)
+    )
+    if research:
+        query = query.where(research_table.name == research)
+    rows = session.execute(query.order_by(research_table.name)).all()
+    if research and not rows:
+        raise ResearchNotFound(research)
+    return rows
+
+
+def _match_expression(query: str) -> str:
+    # Quote every word so user input can never be parsed as FTS5 syntax, and
+    # match it as a prefix so partially typed words still hit.
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in query.split())
+
+
+def _tsquery_expression(query: str) -> str:
+    # The PostgreSQL equivalent: every word a quoted prefix lexeme.
+    return " & ".join(
+        "'" + word.replace("\\", "\\\\").replace("'", "''") + "':*"
+        for word in query.split()
+    )
+
+
+def _search_sqlite(research_filter: str) -> str:
+    return (
+        "SELECT hit.rowid, hit.title, hit.link, research.name "
+        "FROM (SELECT rowid, title, link, research_id, "
+        "bm25(search_index, 10.0, 1.0) AS rank FROM search_index "
+        f"WHERE search_index MATCH :match {research_filter} "
+        "ORDER BY rank LIMIT :limit) AS hit "
+        "LEFT JOIN research ON research.id = hit.research_id "
+        "ORDER BY hit.rank"
+    )
+
+
+def _search_postgresql(research_filter: str) -> str:
+    # Same rowid encoding and weighting as the FTS5 table: names count ten
+    # times as much as links.
+    return (
+        "SELECT hit.rowid, hit.title, hit.link, research.name FROM ("
+        "SELECT 2 * id AS rowid, resource_name AS title, resource_link AS link, "
+        "research_id, 10 * ts_rank(to_tsvector('simple', resource_name), query) "
+        "+ ts_rank(to_tsvector('simple', resource_link), query) AS rank "
+        "FROM resources, to_tsquery('simple', :match) AS query "
+        "WHERE to_tsvector('simple', resource_name || ' ' || resource_link) "
+        f"@@ query {research_filter} "
+        "UNION ALL "
+        "SELECT 2 * key_id + 1, demand, NULL, research_id, "
+        "10 * ts_rank(to_tsvector('simple', coalesce(demand, '')), query) "
+        "FROM demands, to_tsquery('simple', :match) AS query "
+        "WHERE to_tsvector('simple', coalesce(demand, '')) "
+        f"@@ query {research_filter} "
+        "ORDER BY rank DESC LIMIT :limit) AS hit "
+        "LEFT JOIN research ON research.id = hit.research_id "
+        "ORDER BY hit.rank DESC"
+    )
+
+
+def search(
+    session: Session,
+    guild_id: int,
+    query: str,
+    research: str | None = None,
+    limit: int = 10,
+) -> list:
+    """
+    Full-text search over resource names, resource links and demands.
+
+    Results are ranked with names weighted above links (bm25 over FTS5 on
+    SQLite, ts_rank over GIN indexes on PostgreSQL), and limited in the
+    database.
+
+    Args:
+        guild_id (int): Only search the research of this guild.
+        query (str): The words to look for.
+        research (str, optional): Only search inside this research.
+        limit (int): The maximum number of results.
+
+    Returns:
+        list: Rows of ``(kind, ref_id, title, link, research)`` where ``kind`` is
+        ``"resource"`` or ``"demand"``.
+
+    Raises:
+        ResearchNotFound: If ``research`` is given but does not exist.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        match, statement = _tsquery_expression(query), _search_postgresql
+    else:
+        match, statement = _match_expression(query), _search_sqlite
+    if not match:
+        return []
+
+    params = {"match": match, "limit": limit}
+    if research:
+        params["research_id"] = _research_id(session, guild_id, research)
+        research_filter = "AND research_id = :research_id"
+    else:
+        # Walks the guild's slice of uq_research_guild_name.
+        params["guild_id"] = guild_id
+        research_filter = (
+            "AND research_id IN (SELECT id FROM research WHERE guild_id = :guild_id)"
+        )
+
+    rows = session.execute(text(statement(research_filter)), params)
+    return [
+        ("demand" if rowid % 2 else "resource", rowid // 2, title, link, name)
+        for rowid, title, link, name in rows
+    ]
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after ``ttl``.
+
+    Args:
+        maxsize (int): The number of entries kept before evicting the least
+            recently used one.
+        ttl (float): Seconds an entry stays valid.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the cached value, or None if it is missing or expired.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class NameResolver:
+    """
+    Caches research and demand name to id lookups shared by every command.
+
+    Only names that exist are cached, and nothing renames or deletes research
+    or demands, so an entry can only go stale if a row is removed by hand; the
+    repository calls ``forget`` when an update finds no row behind a cached id.
+
+    Attributes:
+        research (LRUCache): Research ids by ``(guild id, research name)``.
+        demands (LRUCache): ``(demand_id, research_id)`` by
+            ``(guild id, research name, demand name)``; a None research name
+            means the first demand with that name in any research of the guild.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300) -> None:
+        self.research = LRUCache(maxsize, ttl)
+        self.demands = LRUCache(maxsize, ttl)
+
+    def clear(self) -> None:
+        self.research.clear()
+        self.demands.clear()
+
+    def forget(self, guild_id: int, research: str, demand: str | None = None) -> None:
+        """
+        Drop the cached ids of a research, or of one of its demands.
+        """
+        if demand is None:
+            self.research.pop((guild_id, research))
+        else:
+            self.demands.pop((guild_id, research, demand))
+            self.demands.pop((guild_id, None, demand))
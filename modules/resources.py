@@ -1,52 +1,129 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from sqlalchemy.orm import Session
-from modules.db import Dbstruct
-from modules.db import BotDb
+from modules import repository
+from modules.metrics import defer
+from modules.autocomplete import (
+    research_autocomplete,
+    demand_autocomplete,
+    resource_autocomplete,
+)
+from modules.helper import guild_scope, import_report_embed, split_list
+from modules import importer
+from modules.importer import ImportFileError
+from modules.export import ExportFormat, export_filename, export_resources
+from modules.pagination import KeysetPaginator
+from modules.render_cache import invalidate
+from modules.repository import ResearchNotFound, DemandNotFound
 from datetime import datetime
-import io
-import json
+import functools
 
-session: Session = BotDb().session
+# Embeds hold at most 25 fields.
+MAX_DEAD_LINKS = 25
 
 
-async def research_autocomplete(
-    interaction: discord.Interaction,
-    current: str,
-):
-    results = session.query(Dbstruct.research.name).all()
-    return [
-        app_commands.Choice(name=name[0], value=name[0])
-        for name in results
-        if (current.lower() in name[0].lower() if current.lower() != "" else True)
-    ]
+def format_size(size: int) -> str:
+    """
+    Format a byte count for display, e.g. ``1.5 MB``.
+    """
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            break
+        size /= 1024
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
 
 
-async def demand_autocomplete(
-    interaction: discord.Interaction,
-    current: str,
-):
-    results = session.query(Dbstruct.demands.demand).all()
-    return [
-        app_commands.Choice(name=name[0], value=name[0])
-        for name in results
-        if current.lower() in name[0].lower()
-    ]
+def link_status_text(status: int | None) -> str:
+    """
+    Describe the outcome of a link check.
+    """
+    return "unreachable" if not status else f"HTTP {status}"
 
 
-async def resource_autocomplete(interaction, current):
-    results = session.query(Dbstruct.resources.resource_name).all()
-    return [
-        app_commands.Choice(name=name[0], value=name[0])
-        for name in results
-        if current.lower() in name[0].lower()
-    ]
+def dead_links_embed(rows: list):
+    """
+    Build the embed listing resources whose link failed its latest check.
+    """
+    embed = discord.Embed(
+        title="🔗 Dead Links",
+        description=f"Showing {len(rows)} broken links.",
+        color=discord.Color.red(),
+        timestamp=datetime.utcnow(),
+    )
+    for row in rows:
+        checked = (
+            row.link_checked_at.strftime("%Y-%m-%d %H:%M")
+            if row.link_checked_at
+            else "-"
+        )
+        embed.add_field(
+            name=f"🔹 {row.resource_name} (#{row.id})",
+            value=(
+                f"🔗 {row.resource_link}\n"
+                f"⚠️ **Status:** {link_status_text(row.link_status)}\n"
+                f"🔁 **Failed checks in a row:** {row.link_failures}\n"
+                f"🕒 **Last checked:** {checked}"
+            ),
+            inline=False,
+        )
+    return embed
+
+
+def resources_embed(total: int, resources: list, page: int):
+    """
+    Build the embed listing one page of resources.
+
+    Args:
+        total (int): The number of resources matching the filters.
+        resources (list): The resource rows of this page.
+        page (int): The page number, starting at 1.
+
+    Returns:
+        discord.Embed: The page embed.
+    """
+    embed = discord.Embed(
+        title="📂 Available Resources",
+        description=f"Showing {total} resources.",
+        color=discord.Color.blue(),
+        timestamp=datetime.utcnow(),
+    )
+    embed.set_thumbnail(
+        url="https://media.tenor.com/LPXrrbFQKsoAAAAi/misinformation-fake-news.gif"
+    )
+    embed.set_footer(text=f"Resource Overview • Page {page}")
+
+    for res in resources:
+        status = "✅ Read" if res.is_read else "❌ Unread"
+        link = f"🔗 **[{res.link_title or 'Resource Link'}]({res.resource_link})**"
+        details = [
+            detail
+            for detail in (
+                res.content_type,
+                format_size(res.content_length) if res.content_length else None,
+            )
+            if detail
+        ]
+        if details:
+            link += f" ({', '.join(details)})"
+        if res.link_failures:
+            link += f"\n⚠️ **Link broken:** {link_status_text(res.link_status)}"
+        embed.add_field(
+            name=f"🔹 {res.resource_name}",
+            value=(
+                f"{link}\n"
+                f"👤 **Added by:** {res.added_by}\n"
+                f"📖 **Status:** {status}\n"
+                "---------"
+            ),
+            inline=False,
+        )
+    return embed
 
 
 class ResourceManagement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.db = bot.db
 
     @app_commands.command(name="add_resource", description="أضف موردًا جديدًا")
     @app_commands.autocomplete(research=research_autocomplete)
@@ -54,31 +131,36 @@ class ResourceManagement(commands.Cog):
     async def add_resource(
         self, interaction, title: str, research: str, demand: str, link: str
     ):
-        research_obj: Dbstruct.research = (
-            session.query(Dbstruct.research)
-            .filter(Dbstruct.research.name == research)
-            .first()
-        )
-
-        demand_entry: Dbstruct.demands = (
-            session.query(Dbstruct.demands)
-            .filter(
-                Dbstruct.demands.research_id == research_obj.id,
-                Dbstruct.demands.demand == demand,
+        guild_id = guild_scope(interaction)
+        try:
+            resource_id, resource_name = await self.db.write(
+                repository.add_resource,
+                guild_id,
+                title,
+                research,
+                demand,
+                link,
+                added_by=interaction.user.name,
             )
-            .first()
-        )
-
-        new_resource = Dbstruct.resources(
-            resource_name=f"{title} - {demand_entry.demand} ",
-            resource_link=link,
-            research_id=research_obj.id,
-            demand_id=demand_entry.id,
-            added_by=interaction.user.name,
-        )
-
-        session.add(new_resource)
-        session.commit()
+        except ResearchNotFound:
+            embed = discord.Embed(
+                title="⚠️ خطأ",
+                description=f"لم يتم العثور على بحث باسم: **{research}**",
+                color=discord.Color.orange(),
+            )
+            await interaction.response.send_message(embed=embed)
+            return
+        except DemandNotFound:
+            embed = discord.Embed(
+                title="⚠️ خطأ",
+                description=f"لم يتم العثور على المطلب **{demand}** ضمن البحث **{research}**",
+                color=discord.Color.orange(),
+            )
+            await interaction.response.send_message(embed=embed)
+            return
+        self.bot.autocomplete.guild(guild_id).resources.add(resource_id, resource_name)
+        invalidate(self.bot, guild_id, research)
+        self.bot.enricher.submit(resource_id, link)
 
         embed = discord.Embed(
             title="✅ تمت الإضافة",
@@ -87,14 +169,56 @@ class ResourceManagement(commands.Cog):
         )
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(
+        name="import_resources", description="استيراد موارد من ملف CSV أو JSON"
+    )
+    @app_commands.describe(file="ملف بالأعمدة: title, research, demand, link")
+    @app_commands.default_permissions(administrator=True)
+    async def import_resources(self, interaction, file: discord.Attachment):
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
+
+        data = await file.read()
+        try:
+            result = await self.db.write(
+                importer.import_resources,
+                guild_id,
+                data,
+                file.filename,
+                interaction.user.name,
+            )
+        except ImportFileError as error:
+            embed = discord.Embed(
+                title="⚠️ خطأ",
+                description=f"تعذر قراءة الملف: {error}",
+                color=discord.Color.orange(),
+            )
+            await interaction.followup.send(embed=embed)
+            return
+
+        for resource_id, resource_name, link in result.inserted:
+            self.bot.autocomplete.guild(guild_id).resources.add(
+                resource_id, resource_name
+            )
+            self.bot.enricher.submit(resource_id, link)
+        if result.inserted:
+            invalidate(self.bot, guild_id)
+
+        await interaction.followup.send(
+            embed=import_report_embed(len(result.inserted), result.errors)
+        )
+
     @app_commands.command(name="delete_resource", description="احذف موردًا")
     @app_commands.autocomplete(resource_id=resource_autocomplete)
     async def delete_resource(self, interaction, resource_id: int):
+        guild_id = guild_scope(interaction)
 
-        resource = session.query(Dbstruct.resources).filter_by(id=resource_id).first()
-        if resource:
-            session.delete(resource)
-            session.commit()
+        research_id = await self.db.write(
+            repository.delete_resource, guild_id, resource_id
+        )
+        if research_id is not None:
+            self.bot.autocomplete.guild(guild_id).resources.discard(resource_id)
+            self.bot.render_cache.bump(research_id)
             embed = discord.Embed(
                 title="🗑️ تم الحذف",
                 description="تم حذف المورد بنجاح.",
@@ -113,7 +237,9 @@ class ResourceManagement(commands.Cog):
     @app_commands.describe(
         research="Filter by research",
         demand="Filter by demand",
-        export="Export as JSON file",
+        export="Export as a file",
+        export_format="The export file format",
+        compress="Gzip the exported file",
     )
     @app_commands.autocomplete(
         research=research_autocomplete, demand=demand_autocomplete
@@ -124,94 +250,100 @@ class ResourceManagement(commands.Cog):
         research: str = None,
         demand: str = None,
         export: bool = False,
+        export_format: ExportFormat = "json",
+        compress: bool = False,
     ):
-        query = session.query(Dbstruct.resources)
-        if research:
-            research_obj = (
-                session.query(Dbstruct.research)
-                .filter(Dbstruct.research.name == research)
-                .first()
-            )
-            if research_obj:
-                query = query.filter(Dbstruct.resources.research_id == research_obj.id)
-
-        if demand:
-            demand_obj = (
-                session.query(Dbstruct.demands)
-                .filter(Dbstruct.demands.demand == demand)
-                .first()
-            )
-            if demand_obj:
-                query = query.filter(Dbstruct.resources.demand_id == demand_obj.id)
-
-        resources = query.all()
-
+        guild_id = guild_scope(interaction)
         if export:
-            resources_data = [
-                {
-                    "Resource Name": res.resource_name,
-                    "Link": res.resource_link,
-                    "Added By": res.added_by,
-                    "Status": "Read" if res.is_read else "Unread",
-                    "Added At": (
-                        res.added_at.strftime("%Y-%m-%d %H:%M:%S")
-                        if res.added_at
-                        else "Unknown"
-                    ),
-                }
-                for res in resources
-            ]
-            json_bytes = io.BytesIO(
-                json.dumps(resources_data, ensure_ascii=False, indent=4).encode("utf-8")
-            )
-            json_bytes.seek(0)
-            await interaction.response.send_message(
-                "📂 Exported resources as JSON.",
-                file=discord.File(json_bytes, "resources.json"),
+            # Large exports take seconds to build, past the time Discord
+            # allows before the interaction must be acknowledged.
+            await defer(interaction)
+            spool = await self.db.run(
+                export_resources, guild_id, research, demand, export_format, compress
+            )
+            await interaction.followup.send(
+                "📂 Exported resources.",
+                file=discord.File(
+                    spool, export_filename("resources", export_format, compress)
+                ),
             )
             return
 
-        if not resources:
+        cache = self.bot.render_cache
+        research_ids = self.bot.autocomplete.guild(guild_id).research_ids
+        research_id = research_ids.get(research) if research else None
+        cache_key = ("resources", guild_id, research, demand)
+        total = cache.get(research_id, (cache_key, "total"))
+        if total is None:
+            version = cache.version(research_id)
+            total = await self.db.run(
+                repository.count_resources, guild_id, research, demand
+            )
+            cache.set(research_id, (cache_key, "total"), total, version)
+        if not total:
             embed = discord.Embed(
                 title="📚 Available Resources",
                 description="No resources found.",
                 color=discord.Color.orange(),
             )
+            await interaction.response.send_message(embed=embed)
+            return
+
+        paginator = KeysetPaginator(
+            interaction.user.id,
+            fetch=functools.partial(
+                self.db.run, repository.resource_page, guild_id, research, demand
+            ),
+            render=functools.partial(resources_embed, total),
+            cache=cache,
+            research_id=research_id,
+            cache_key=cache_key,
+        )
+        embed = await paginator.start()
+        if paginator.has_next:
+            await interaction.response.send_message(embed=embed, view=paginator)
+            paginator.message = await interaction.original_response()
         else:
+            await interaction.response.send_message(embed=embed)
+
+    @app_commands.command(name="dead_links", description="عرض الروابط المعطلة")
+    @app_commands.describe(research="Filter by research")
+    @app_commands.autocomplete(research=research_autocomplete)
+    async def dead_links(self, interaction, research: str = None):
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
+        try:
+            rows = await self.db.run(
+                repository.dead_links, guild_id, research, MAX_DEAD_LINKS
+            )
+        except ResearchNotFound:
             embed = discord.Embed(
-                title="📂 Available Resources",
-                description=f"Showing {len(resources)} resources.",
-                color=discord.Color.blue(),
-                timestamp=datetime.utcnow(),
-            )
-            embed.set_thumbnail(
-                url="https://media.tenor.com/LPXrrbFQKsoAAAAi/misinformation-fake-news.gif"
-            )
-            embed.set_footer(text="Resource Overview")
-
-            for res in resources:
-                status = "✅ Read" if res.is_read else "❌ Unread"
-                embed.add_field(
-                    name=f"🔹 {res.resource_name}",
-                    value=(
-                        f"🔗 **[Resource Link]({res.resource_link})**\n"
-                        f"👤 **Added by:** {res.added_by}\n"
-                        f"📖 **Status:** {status}\n"
-                        "---------"
-                    ),
-                    inline=False,
-                )
-        await interaction.response.send_message(embed=embed)
+                title="⚠️ خطأ",
+                description=f"لم يتم العثور على بحث باسم: **{research}**",
+                color=discord.Color.orange(),
+            )
+            await interaction.followup.send(embed=embed)
+            return
+        if not rows:
+            embed = discord.Embed(
+                title="🔗 Dead Links",
+                description="No broken links found.",
+                color=discord.Color.green(),
+            )
+            await interaction.followup.send(embed=embed)
+            return
+        await interaction.followup.send(embed=dead_links_embed(rows))
 
     @app_commands.command(name="mark_complete", description="وضع علامة كمكتمل")
     @app_commands.autocomplete(resource_id=resource_autocomplete)
     async def mark_complete(self, interaction, resource_id: int):
+        guild_id = guild_scope(interaction)
 
-        resource = session.query(Dbstruct.resources).filter_by(id=resource_id).first()
-        if resource:
-            resource.is_read = True
-            resource.read_by = interaction.user.name
-            session.commit()
+        research_id = await self.db.write(
+            repository.mark_resource_read, guild_id, resource_id, interaction.user.name
+        )
+        if research_id is not None:
+            self.bot.render_cache.bump(research_id)
             embed = discord.Embed(
                 title="✅ تم الإكمال",
                 description=f"تم وضع علامة كمكتمل بواسطة {interaction.user.name}.",
@@ -226,6 +358,60 @@ class ResourceManagement(commands.Cog):
 
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(
+        name="bulk_mark_complete", description="وضع علامة مكتمل على عدة موارد"
+    )
+    @app_commands.describe(
+        research="اسم البحث",
+        demand="موارد هذا المطلب فقط",
+        ids="أرقام الموارد مفصولة بفواصل (اتركه فارغًا لكل الموارد)",
+    )
+    @app_commands.autocomplete(
+        research=research_autocomplete, demand=demand_autocomplete
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def bulk_mark_complete(
+        self, interaction, research: str, demand: str = None, ids: str = None
+    ):
+        guild_id = guild_scope(interaction)
+        try:
+            resource_ids = [int(item) for item in split_list(ids)]
+        except ValueError:
+            embed = discord.Embed(
+                title="⚠️ خطأ",
+                description="يجب أن تكون أرقام الموارد أعدادًا مفصولة بفواصل.",
+                color=discord.Color.orange(),
+            )
+            await interaction.response.send_message(embed=embed)
+            return
+
+        try:
+            changed = await self.db.write(
+                repository.bulk_mark_resources_read,
+                guild_id,
+                research,
+                interaction.user.name,
+                demand=demand,
+                ids=resource_ids,
+            )
+        except ResearchNotFound:
+            embed = discord.Embed(
+                title="⚠️ خطأ",
+                description=f"لم يتم العثور على بحث باسم: **{research}**",
+                color=discord.Color.orange(),
+            )
+            await interaction.response.send_message(embed=embed)
+            return
+        if changed:
+            invalidate(self.bot, guild_id, research)
+
+        embed = discord.Embed(
+            title="✅ تم الإكمال",
+            description=f"تم وضع علامة مكتمل على {changed} مورد بواسطة {interaction.user.name}.",
+            color=discord.Color.green(),
+        )
+        await interaction.response.send_message(embed=embed)
+
 
 async def setup(bot: commands.bot):
     await bot.add_cog(ResourceManagement(bot=bot))
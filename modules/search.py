@@ -0,0 +1,82 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from modules import repository
+from modules.helper import guild_scope
+from modules.metrics import defer
+from modules.autocomplete import research_autocomplete
+from modules.repository import ResearchNotFound
+
+# Results are shown as embed fields, which Discord caps at 25 per embed.
+MAX_RESULTS = 10
+
+
+class Search(commands.Cog):
+    """
+    Full-text search over resources and demands.
+
+    Attributes:
+        bot (discord.Client): The Discord bot instance.
+        db (BotDb): The database shared by every cog of the bot.
+    """
+
+    def __init__(self, bot: discord.Client):
+        self.bot = bot
+        self.db = bot.db
+
+    @app_commands.command(name="search", description="ابحث في الموارد والمطالب")
+    @app_commands.describe(query="كلمات البحث", research="حصر البحث في بحث معين")
+    @app_commands.autocomplete(research=research_autocomplete)
+    async def search(
+        self, interaction: discord.Interaction, query: str, research: str = None
+    ):
+        await defer(interaction)
+        guild_id = guild_scope(interaction)
+
+        try:
+            results = await self.db.run(
+                repository.search, guild_id, query, research, limit=MAX_RESULTS
+            )
+        except ResearchNotFound:
+            embed = discord.Embed(
+                title="❌ البحث غير موجود",
+                description=f"لم يتم العثور على بحث باسم:\n**{research}**",
+                color=discord.Color.red(),
+            )
+            embed.set_footer(text="نظام إدارة الأبحاث")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+
+        if not results:
+            embed = discord.Embed(
+                title="🔎 نتائج البحث",
+                description=f"لا توجد نتائج لـ **{query}**",
+                color=discord.Color.orange(),
+            )
+            await interaction.followup.send(embed=embed)
+            return
+
+        embed = discord.Embed(
+            title="🔎 نتائج البحث",
+            description=f"أفضل {len(results)} نتائج لـ **{query}**",
+            color=discord.Color.blue(),
+            timestamp=discord.utils.utcnow(),
+        )
+        for kind, ref_id, title, link, research_name in results:
+            if kind == "resource":
+                value = (
+                    f"🔗 **[Resource Link]({link})**\n"
+                    f"🆔 {ref_id} | 📚 {research_name}"
+                )
+                embed.add_field(name=f"📄 {title}", value=value, inline=False)
+            else:
+                embed.add_field(
+                    name=f"📌 {title}", value=f"📚 {research_name}", inline=False
+                )
+        embed.set_footer(text="نظام إدارة الأبحاث")
+
+        await interaction.followup.send(embed=embed)
+
+
+async def setup(bot: commands.bot):
+    await bot.add_cog(Search(bot=bot))
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from discord import app_commands
+
+
+def command_tree_hash(tree: app_commands.CommandTree) -> str:
+    """
+    Hash the global commands exactly as ``tree.sync`` would upload them.
+
+    The application id is part of the hash, so bots sharing a checkout, e.g. a
+    development and a production bot, never skip a sync the other one did.
+    """
+    commands = [command.to_dict(tree) for command in tree.get_commands()]
+    commands.sort(key=lambda command: (command["type"], command["name"]))
+    payload = {"application_id": tree.client.application_id, "commands": commands}
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def command_hash_path_from_env() -> str:
+    """
+    Read where the hash of the last synced command tree is kept.
+    """
+    return os.environ.get("COMMAND_HASH_FILE", ".command_tree.sha256")
+
+
+async def sync_if_changed(tree: app_commands.CommandTree, path: str) -> bool:
+    """
+    Sync the global commands only if they changed since the last sync.
+
+    The hash is written after a successful sync only, so a failed sync is
+    retried on the next start.
+
+    Args:
+        tree (app_commands.CommandTree): The bot's command tree.
+        path (str): The file holding the hash of the last synced tree.
+
+    Returns:
+        bool: Whether the tree was synced.
+    """
+    digest = command_tree_hash(tree)
+    try:
+        with open(path, encoding="utf-8") as file:
+            if file.read().strip() == digest:
+                return False
+    except FileNotFoundError:
+        pass
+
+    await tree.sync()
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(digest + "\n")
+    return True
+
+
+class StartupTimer:
+    """
+    Wall-clock time of each startup phase, in the order they ran.
+
+    Attributes:
+        phases (dict[str, float]): Seconds spent in each phase.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def report(self) -> str:
+        parts = [
+            f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items()
+        ]
+        total = sum(self.phases.values()) * 1000
+        return f"Startup took {total:.0f} ms: " + ", ".join(parts)
@@ -0,0 +1,104 @@
+import asyncio
+import contextlib
+import types
+
+from aiohttp import web
+
+from modules import repository
+from modules.db import BotDb
+from modules.enrichment import LinkEnricher
+from modules.linkhealth import LinkHealthChecker
+from modules.render_cache import RenderCache
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@contextlib.asynccontextmanager
+async def stub_server(handler):
+    """
+    Serve every method and path with ``handler`` on a free local port.
+
+    Yields:
+        str: The base URL of the server, without a trailing slash.
+    """
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        await runner.cleanup()
+
+
+class FakeBot(types.SimpleNamespace):
+    """
+    The parts of the bot the background link workers use.
+    """
+
+    def __init__(self, db: BotDb) -> None:
+        super().__init__(db=db, render_cache=RenderCache())
+
+    async def wait_until_ready(self) -> None:
+        # The tests drive the loops by hand; the scheduled runs never start.
+        await asyncio.Event().wait()
+
+
+async def stub_enricher(bot: FakeBot, **options) -> LinkEnricher:
+    """
+    Start an enricher that may fetch from the stub server on 127.0.0.1.
+    """
+    enricher = LinkEnricher(bot, public_only=False, **options)
+    await enricher.start()
+    return enricher
+
+
+def stub_link_checker(bot: FakeBot, **options) -> LinkHealthChecker:
+    """
+    Start a link checker that may request the stub server on 127.0.0.1.
+    """
+    checker = LinkHealthChecker(bot, public_only=False, **options)
+    checker.start()
+    return checker
+
+
+async def open_db(path) -> BotDb:
+    db = BotDb(f"sqlite:///{path / 'test.db'}")
+    await db.migrate()
+    return db
+
+
+async def close_db(db: BotDb) -> None:
+    await db.stop_writes()
+    db.close()
+
+
+async def add_resources(
+    db: BotDb, links: list[str], guild_id: int = 1, research: str = "R"
+) -> list[int]:
+    """
+    Add a research with one demand holding a resource per link.
+
+    Returns:
+        list[int]: The resource ids, in the order of ``links``.
+    """
+    await db.write(repository.add_research, guild_id, research)
+    await db.write(repository.add_demand, guild_id, research, "D", "tester", None, None)
+    ids = []
+    for index, link in enumerate(links):
+        resource_id, _name = await db.write(
+            repository.add_resource,
+            guild_id,
+            f"resource {index}",
+            research,
+            "D",
+            link,
+            added_by="tester",
+        )
+        ids.append(resource_id)
+    return ids
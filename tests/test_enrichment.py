@@ -0,0 +1,321 @@
+import asyncio
+import time
+
+from aiohttp import web
+from sqlalchemy import select
+
+from modules.db import Dbstruct
+from modules import netguard
+from modules.enrichment import LinkEnricher, LinkMetadata
+from tests.support import (
+    FakeBot,
+    add_resources,
+    close_db,
+    open_db,
+    run,
+    stub_enricher,
+    stub_server,
+)
+
+PAGE = "<html><head><title>\n  A   research page </title></head><body>x</body></html>"
+
+
+async def _enricher(**options) -> LinkEnricher:
+    return await stub_enricher(FakeBot(db=None), **options)
+
+
+def test_reads_title_content_type_and_size():
+    async def handler(request):
+        if request.path == "/page":
+            return web.Response(text=PAGE, content_type="text/html")
+        return web.Response(body=b"%PDF" * 750, content_type="application/pdf")
+
+    async def scenario():
+        async with stub_server(handler) as base:
+            enricher = await _enricher()
+            try:
+                return (
+                    await enricher.fetch(f"{base}/page"),
+                    await enricher.fetch(f"{base}/paper.pdf"),
+                )
+            finally:
+                await enricher.close()
+
+    page, pdf = run(scenario())
+    assert page == LinkMetadata("A research page", "text/html", len(PAGE))
+    assert pdf == LinkMetadata(None, "application/pdf", 3000)
+
+
+def test_title_split_across_chunks_and_multibyte_characters():
+    title = "بحث عن الذكاء"
+
+    async def handler(request):
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/html; charset=utf-8"}
+        )
+        await response.prepare(request)
+        encoded = f"<title>{title}</title>".encode()
+        # Split inside a two-byte character.
+        await response.write(encoded[:10])
+        await asyncio.sleep(0.01)
+        await response.write(encoded[10:] + b"<body>" + b"a" * 200_000)
+        return response
+
+    async def scenario():
+        async with stub_server(handler) as base:
+            enricher = await _enricher()
+            try:
+                return await enricher.fetch(f"{base}/streamed")
+            finally:
+                await enricher.close()
+
+    metadata = run(scenario())
+    assert metadata.title == title
+    assert metadata.size is None
+
+
+def test_concurrent_fetches_of_one_url_share_a_request():
+    hits = []
+
+    async def handler(request):
+        hits.append(request.path)
+        await asyncio.sleep(0.1)
+        return web.Response(text=PAGE, content_type="text/html")
+
+    async def scenario():
+        async with stub_server(handler) as base:
+            enricher = await _enricher()
+            try:
+                results = await asyncio.gather(
+                    *(enricher.fetch(f"{base}/shared") for _ in range(5))
+                )
+                # Later fetches are answered from the cache.
+                results.append(await enricher.fetch(f"{base}/shared"))
+                return results
+            finally:
+                await enricher.close()
+
+    results = run(scenario())
+    assert hits == ["/shared"]
+    assert len(set(results)) == 1
+    assert results[0].title == "A research page"
+
+
+def test_per_host_limit():
+    active = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return web.Response(text="ok", content_type="text/plain")
+
+    async def scenario():
+        async with stub_server(handler) as base:
+            enricher = await _enricher(concurrency=8, per_host=2)
+            try:
+                await asyncio.gather(
+                    *(enricher.fetch(f"{base}/{index}") for index in range(8))
+                )
+            finally:
+                await enricher.close()
+
+    run(scenario())
+    assert peak == 2
+
+
+def test_timeout_gives_no_metadata():
+    async def handler(request):
+        await asyncio.sleep(2)
+        return web.Response(text=PAGE, content_type="text/html")
+
+    async def scenario():
+        async with stub_server(handler) as base:
+            enricher = await _enricher(timeout=0.2)
+            try:
+                start = time.perf_counter()
+                metadata = await enricher.fetch(f"{base}/slow")
+                return metadata, time.perf_counter() - start
+            finally:
+                await enricher.close()
+
+    metadata, elapsed = run(scenario())
+    assert metadata is None
+    assert elapsed < 1
+
+
+def test_client_errors_are_not_cached():
+    hits = []
+
+    async def handler(request):
+        hits.append(request.path)
+        return web.Response(status=404)
+
+    async def scenario():
+        async with stub_server(handler) as base:
+            enricher = await _enricher()
+            try:
+                return [await enricher.fetch(f"{base}/missing") for _ in range(2)]
+            finally:
+                await enricher.close()
+
+    assert run(scenario()) == [None, None]
+    assert hits == ["/missing", "/missing"]
+
+
+def test_non_http_links_are_not_fetched():
+    async def scenario():
+        enricher = await _enricher()
+        try:
+            return [
+                await enricher.fetch(link)
+                for link in ("ftp://example.com/paper.pdf", "not a link", "http://")
+            ]
+        finally:
+            await enricher.close()
+
+    assert run(scenario()) == [None, None, None]
+
+
+def test_submit_stores_metadata_and_invalidates_pages(tmp_path):
+    async def handler(request):
+        return web.Response(text=PAGE, content_type="text/html")
+
+    async def scenario():
+        db = await open_db(tmp_path)
+        bot = FakeBot(db)
+        enricher = await stub_enricher(bot)
+        try:
+            async with stub_server(handler) as base:
+                (resource_id,) = await add_resources(db, [f"{base}/page"])
+                research_id = await db.run(
+                    lambda session: session.scalar(
+                        select(Dbstruct.resources.research_id)
+                    )
+                )
+                version = bot.render_cache.version(research_id)
+                enricher.submit(resource_id, f"{base}/page")
+                await asyncio.gather(*enricher._tasks)
+            resources = Dbstruct.resources
+            row = await db.run(
+                lambda session: session.execute(
+                    select(
+                        resources.link_title,
+                        resources.content_type,
+                        resources.content_length,
+                        resources.enriched_at,
+                    )
+                ).one()
+            )
+            return row, version != bot.render_cache.version(research_id)
+        finally:
+            await enricher.close()
+            await close_db(db)
+
+    row, bumped = run(scenario())
+    assert row.link_title == "A research page"
+    assert row.content_type == "text/html"
+    assert row.content_length == len(PAGE)
+    assert row.enriched_at is not None
+    assert bumped
+
+
+def test_redirects_are_followed():
+    async def handler(request):
+        if request.path == "/old":
+            raise web.HTTPFound("/moved")
+        if request.path == "/moved":
+            raise web.HTTPMovedPermanently("/page")
+        return web.Response(text=PAGE, content_type="text/html")
+
+    async def scenario():
+        async with stub_server(handler) as base:
+            enricher = await _enricher()
+            try:
+                return await enricher.fetch(f"{base}/old")
+            finally:
+                await enricher.close()
+
+    assert run(scenario()).title == "A research page"
+
+
+def test_non_public_addresses_are_refused():
+    hits = []
+
+    async def handler(request):
+        hits.append(request.path)
+        return web.Response(text=PAGE, content_type="text/html")
+
+    async def scenario():
+        async with stub_server(handler) as base:
+            port = base.rsplit(":", 1)[1]
+            enricher = LinkEnricher(FakeBot(db=None))
+            await enricher.start()
+            try:
+                return [
+                    await enricher.fetch(link)
+                    for link in (
+                        f"{base}/literal",
+                        f"http://localhost:{port}/resolved",
+                        f"http://[::ffff:127.0.0.1]:{port}/mapped",
+                    )
+                ]
+            finally:
+                await enricher.close()
+
+    assert run(scenario()) == [None, None, None]
+    assert hits == []
+
+
+def test_redirect_to_a_non_public_address_is_refused(monkeypatch):
+    hits, checked = [], []
+
+    def is_public_address(address):
+        # Let the first hop reach the stub, but nothing else on loopback.
+        checked.append(address)
+        return address == "127.0.0.1"
+
+    monkeypatch.setattr(netguard, "is_public_address", is_public_address)
+
+    async def handler(request):
+        hits.append(request.host)
+        port = request.url.port
+        raise web.HTTPFound(f"http://127.0.0.2:{port}/internal")
+
+    async def scenario():
+        async with stub_server(handler) as base:
+            enricher = LinkEnricher(FakeBot(db=None))
+            await enricher.start()
+            try:
+                return await enricher.fetch(f"{base}/redirect")
+            finally:
+                await enricher.close()
+
+    assert run(scenario()) is None
+    assert len(hits) == 1
+    assert checked == ["127.0.0.1", "127.0.0.2"]
+
+
+def test_public_addresses():
+    assert netguard.is_public_address("93.184.216.34")
+    assert netguard.is_public_address("2606:2800:220:1:248:1893:25c8:1946")
+    for address in (
+        "127.0.0.1",
+        "10.1.2.3",
+        "172.16.0.1",
+        "192.168.1.1",
+        "169.254.169.254",
+        "100.64.0.1",
+        "0.0.0.0",
+        "224.0.0.1",
+        "240.0.0.1",
+        "::1",
+        "fe80::1",
+        "fc00::1",
+        "ff02::1",
+        "::ffff:10.0.0.1",
+    ):
+        assert not netguard.is_public_address(address), address
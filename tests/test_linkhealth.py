@@ -0,0 +1,333 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+from aiohttp import web
+from sqlalchemy import select
+
+from modules import repository
+from modules.db import Dbstruct
+from modules.linkhealth import HostRateLimiter, LinkHealthChecker
+from modules.repository import ResearchNotFound
+from tests.support import (
+    FakeBot,
+    add_resources,
+    close_db,
+    open_db,
+    run,
+    stub_link_checker,
+    stub_server,
+)
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+async def _link_states(db) -> dict:
+    resources = Dbstruct.resources
+    rows = await db.run(
+        lambda session: session.execute(
+            select(
+                resources.id,
+                resources.link_status,
+                resources.link_failures,
+                resources.link_etag,
+                resources.link_last_modified,
+                resources.link_latency_ms,
+                resources.link_checked_at,
+            )
+        ).all()
+    )
+    return {row.id: row for row in rows}
+
+
+async def _rounds(tmp_path, handler, links, rounds, **options):
+    """
+    Run ``rounds`` checking rounds over ``links`` against the stub server.
+
+    ``{base}`` in a link is replaced with the stub server's URL.
+
+    Returns:
+        tuple: The resource ids, the number of links each round checked and
+        the link states after every round.
+    """
+    db = await open_db(tmp_path)
+    options.setdefault("recheck_after", datetime.timedelta(0))
+    options.setdefault("host_interval", 0)
+    checker = options.pop("checker", stub_link_checker)(FakeBot(db), **options)
+    try:
+        async with stub_server(handler) as base:
+            ids = await add_resources(db, [link.format(base=base) for link in links])
+            checked, states = [], []
+            for _ in range(rounds):
+                checked.append(await checker.run_once())
+                states.append(await _link_states(db))
+        return ids, checked, states
+    finally:
+        await checker.stop()
+        await close_db(db)
+
+
+def test_conditional_request_answered_with_304(tmp_path):
+    requests = []
+
+    async def handler(request):
+        requests.append(
+            (
+                request.method,
+                request.headers.get("If-None-Match"),
+                request.headers.get("If-Modified-Since"),
+            )
+        )
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304)
+        return web.Response(
+            text="paper", headers={"ETag": ETAG, "Last-Modified": LAST_MODIFIED}
+        )
+
+    (resource_id,), checked, states = run(
+        _rounds(tmp_path, handler, ["{base}/paper"], rounds=2)
+    )
+    assert checked == [1, 1]
+    assert requests == [("HEAD", None, None), ("HEAD", ETAG, LAST_MODIFIED)]
+    first, second = states[0][resource_id], states[1][resource_id]
+    assert (first.link_status, first.link_etag) == (200, ETAG)
+    assert first.link_last_modified == LAST_MODIFIED
+    # A 304 keeps the stored validators and counts as alive.
+    assert (second.link_status, second.link_failures) == (304, 0)
+    assert (second.link_etag, second.link_last_modified) == (ETAG, LAST_MODIFIED)
+    assert second.link_latency_ms is not None
+
+
+@pytest.mark.parametrize("refusal", [405, 501])
+def test_head_refused_falls_back_to_get(tmp_path, refusal):
+    methods = []
+
+    async def handler(request):
+        methods.append(request.method)
+        if request.method == "HEAD":
+            return web.Response(status=refusal)
+        return web.Response(text="paper")
+
+    (resource_id,), _checked, states = run(
+        _rounds(tmp_path, handler, ["{base}/no-head"], rounds=1)
+    )
+    assert methods == ["HEAD", "GET"]
+    assert states[0][resource_id].link_status == 200
+    assert states[0][resource_id].link_failures == 0
+
+
+def test_get_fallback_waits_for_the_host(tmp_path):
+    arrivals = []
+
+    async def handler(request):
+        arrivals.append((request.method, time.perf_counter()))
+        if request.method == "HEAD":
+            return web.Response(status=405)
+        return web.Response(text="paper")
+
+    run(_rounds(tmp_path, handler, ["{base}/no-head"], rounds=1, host_interval=0.2))
+    (head, head_at), (get, get_at) = arrivals
+    assert (head, get) == ("HEAD", "GET")
+    assert get_at - head_at >= 0.19
+
+
+def test_failures_count_up_and_reset(tmp_path):
+    statuses = iter([500, 404, 200, 503])
+
+    async def handler(request):
+        return web.Response(status=next(statuses))
+
+    (resource_id,), _checked, states = run(
+        _rounds(tmp_path, handler, ["{base}/flaky"], rounds=4)
+    )
+    assert [state[resource_id].link_failures for state in states] == [1, 2, 0, 1]
+    assert [state[resource_id].link_status for state in states] == [
+        500,
+        404,
+        200,
+        503,
+    ]
+
+
+def test_unreachable_host_is_status_zero(tmp_path):
+    async def handler(request):
+        return web.Response(text="unused")
+
+    # Nothing listens on port 1.
+    (resource_id,), _checked, states = run(
+        _rounds(tmp_path, handler, ["http://127.0.0.1:1/paper"], rounds=2)
+    )
+    assert [state[resource_id].link_status for state in states] == [0, 0]
+    assert [state[resource_id].link_failures for state in states] == [1, 2]
+
+
+def _public_only_checker(bot, **options):
+    checker = LinkHealthChecker(bot, **options)
+    checker.start()
+    return checker
+
+
+def test_non_public_addresses_are_refused(tmp_path):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.path)
+        return web.Response(text="paper")
+
+    (resource_id,), _checked, states = run(
+        _rounds(
+            tmp_path,
+            handler,
+            ["{base}/paper"],
+            rounds=1,
+            checker=_public_only_checker,
+        )
+    )
+    assert requests == []
+    # A refused link looks like an unreachable one.
+    state = states[0][resource_id]
+    assert (state.link_status, state.link_failures) == (0, 1)
+
+
+def test_non_http_links_are_recorded_without_a_request(tmp_path):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.path)
+        return web.Response(text="unused")
+
+    (resource_id,), checked, states = run(
+        _rounds(tmp_path, handler, ["ftp://example.com/paper.pdf"], rounds=1)
+    )
+    assert checked == [1]
+    assert requests == []
+    state = states[0][resource_id]
+    assert (state.link_status, state.link_failures) == (None, 0)
+    assert state.link_checked_at is not None
+
+
+def test_second_round_within_recheck_window_checks_nothing(tmp_path):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.path)
+        return web.Response(text="paper")
+
+    links = [f"{{base}}/{index}" for index in range(5)]
+    _ids, checked, _states = run(
+        _rounds(
+            tmp_path,
+            handler,
+            links,
+            rounds=2,
+            recheck_after=datetime.timedelta(hours=1),
+            batch_size=2,
+        )
+    )
+    # The first round reads every link over three batches.
+    assert checked == [5, 0]
+    assert sorted(requests) == [f"/{index}" for index in range(5)]
+
+
+def test_state_changes_invalidate_rendered_pages(tmp_path):
+    statuses = iter([404, 404, 200])
+
+    async def scenario():
+        async def handler(request):
+            return web.Response(status=next(statuses))
+
+        db = await open_db(tmp_path)
+        bot = FakeBot(db)
+        checker = stub_link_checker(
+            bot, recheck_after=datetime.timedelta(0), host_interval=0
+        )
+        try:
+            async with stub_server(handler) as base:
+                await add_resources(db, [f"{base}/paper"])
+                research_id = await db.run(
+                    lambda session: session.scalar(
+                        select(Dbstruct.resources.research_id)
+                    )
+                )
+                versions = [bot.render_cache.version(research_id)]
+                for _ in range(3):
+                    await checker.run_once()
+                    versions.append(bot.render_cache.version(research_id))
+            return versions
+        finally:
+            await checker.stop()
+            await close_db(db)
+
+    before, dead, still_dead, alive = run(scenario())
+    assert dead != before
+    assert still_dead == dead
+    assert alive != still_dead
+
+
+def test_dead_links_by_guild_and_research(tmp_path):
+    async def scenario():
+        db = await open_db(tmp_path)
+        try:
+            first = await add_resources(db, ["a", "b", "c"], guild_id=1, research="R1")
+            second = await add_resources(db, ["d"], guild_id=1, research="R2")
+            other = await add_resources(db, ["e"], guild_id=2, research="R1")
+            failures = {first[0]: 1, first[1]: 3, second[0]: 2, other[0]: 5}
+            checks = [
+                {
+                    "resource_id": resource_id,
+                    "link_status": 404 if failures.get(resource_id) else 200,
+                    "link_latency_ms": 1,
+                    "link_etag": None,
+                    "link_last_modified": None,
+                    "link_failures": failures.get(resource_id, 0),
+                }
+                for resource_id in first + second + other
+            ]
+            await db.write(
+                repository.record_link_checks, checks, datetime.datetime(2024, 1, 1)
+            )
+            guild = await db.run(repository.dead_links, 1)
+            research = await db.run(repository.dead_links, 1, "R1")
+            limited = await db.run(repository.dead_links, 1, None, 1)
+            with pytest.raises(ResearchNotFound):
+                await db.run(repository.dead_links, 1, "missing")
+            return first, second, guild, research, limited
+        finally:
+            await close_db(db)
+
+    first, second, guild, research, limited = run(scenario())
+    # Most consecutive failures first; guild 2 and live links never show.
+    assert [row.id for row in guild] == [first[1], second[0], first[0]]
+    assert [row.link_failures for row in guild] == [3, 2, 1]
+    assert [row.id for row in research] == [first[1], first[0]]
+    assert [row.id for row in limited] == [first[1]]
+    assert guild[0].link_checked_at == datetime.datetime(2024, 1, 1)
+
+
+def test_host_rate_limiter_spaces_requests_per_host():
+    async def scenario():
+        limiter = HostRateLimiter(0.05)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        starts = {}
+
+        async def request(host):
+            await limiter.wait(host)
+            starts.setdefault(host, []).append(loop.time() - started)
+
+        await asyncio.gather(
+            *(request("a.example") for _ in range(4)), request("b.example")
+        )
+        return starts
+
+    starts = run(scenario())
+    gaps = [
+        later - earlier
+        for earlier, later in zip(starts["a.example"], starts["a.example"][1:])
+    ]
+    assert len(starts["a.example"]) == 4
+    assert all(gap >= 0.045 for gap in gaps)
+    # Another host is not held back by the first one.
+    assert starts["b.example"][0] < 0.03